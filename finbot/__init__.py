@@ -13,17 +13,38 @@ __author__ = "Varun Agarwal"
 __email__ = "agvarun34@gmail.com"
 __description__ = "Privacy-focused Canadian financial assistant using RAG"
 
-# Core module imports for easy access
-from finbot.config import validate_config
-from finbot.llm import get_llm
-from finbot.embedding.embedder import embed
-from finbot.retriever.similarity import retrieve_similar
-from finbot.prompt.formatter import build_prompt
+import importlib
+
+# Core API, imported lazily on first attribute access (PEP 562) so that
+# importing finbot does not pull in torch, llama.cpp or psycopg2
+_LAZY_ATTRIBUTES = {
+    "validate_config": "finbot.config",
+    "get_llm": "finbot.llm",
+    "embed": "finbot.embedding.embedder",
+    "embed_query": "finbot.embedding.embedder",
+    "retrieve_similar": "finbot.retriever.similarity",
+    "retrieve_similar_batch": "finbot.retriever.similarity",
+    "build_prompt": "finbot.prompt.formatter",
+}
 
 __all__ = [
     "validate_config",
     "get_llm", 
     "embed",
+    "embed_query",
     "retrieve_similar",
+    "retrieve_similar_batch",
     "build_prompt"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
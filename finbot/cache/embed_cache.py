@@ -0,0 +1,97 @@
+"""
+Embedding Cache
+
+Persistent on-disk cache mapping chunk text hashes to embeddings, so
+re-ingesting unchanged documents skips the embedding model entirely.
+Embeddings are stored as float16 (half the bytes) and upcast on load.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH_SIZE = 500
+
+
+def chunk_hash(text: str, model_name: str = "") -> str:
+    """
+    Hash chunk text after whitespace normalization.
+
+    Args:
+        text: Chunk text
+        model_name: Embedding model name, so different models never collide
+
+    Returns:
+        Hex digest identifying the (model, text) pair
+    """
+    normalized = " ".join(text.split())
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed hash -> embedding store."""
+
+    def __init__(self, path: Path, dimension: int):
+        """
+        Open (creating if needed) the cache database.
+
+        Args:
+            path: SQLite database file
+            dimension: Embedding dimension
+        """
+        self.dimension = dimension
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            keys: Chunk hashes to look up
+
+        Returns:
+            Dictionary of hash -> float32 embedding for every cache hit
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + _LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.connection.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                embedding = np.frombuffer(blob, dtype=np.float16)
+                if embedding.shape[0] == self.dimension:
+                    found[key] = embedding.astype(np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """
+        Store embeddings in a single transaction.
+
+        Args:
+            items: Dictionary of hash -> embedding
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                ((key, np.asarray(embedding, dtype=np.float16).tobytes())
+                 for key, embedding in items.items())
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
@@ -0,0 +1,184 @@
+"""
+LSH Retrieval Cache
+
+In-process cache of retrieval results keyed on the query embedding.
+Random-projection LSH narrows a lookup to the handful of cached queries
+that share a bucket with the new one, so near-duplicate queries are served
+without a database round trip.
+
+Entries are never invalidated: the cache lives for one process, and
+documents are ingested by a separate `--ingest` run, so results can be
+stale until the interactive session is restarted.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Optional; the NumPy path is used instead
+    njit = None
+
+
+def _signature_kernel(embedding: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """
+    Bucket id of the embedding in each table, in one fused pass.
+
+    Args:
+        embedding: Contiguous float32 vector of shape (dimension,)
+        planes: Contiguous float32 hyperplanes of shape (tables, bits, dimension)
+
+    Returns:
+        int64 array with one bucket id per table
+    """
+    num_tables, num_bits, dimension = planes.shape
+    buckets = np.zeros(num_tables, dtype=np.int64)
+    for table in range(num_tables):
+        bucket = 0
+        for bit in range(num_bits):
+            dot = np.float32(0.0)
+            for i in range(dimension):
+                dot += planes[table, bit, i] * embedding[i]
+            if dot > 0:
+                bucket |= 1 << bit
+        buckets[table] = bucket
+    return buckets
+
+
+# Compiled with Numba when available; interpreted loops would be slower
+# than the NumPy matmul, so the kernel is only used in compiled form
+_signatures = (
+    njit(cache=True, fastmath=True, boundscheck=False)(_signature_kernel)
+    if njit is not None else None
+)
+
+
+@dataclass
+class _LSHEntry:
+    """Cached retrieval result for one query embedding."""
+    embedding: np.ndarray
+    buckets: np.ndarray
+    top_k: int
+    results: List[Dict[str, Any]]
+
+
+class LSHCache:
+    """LRU cache of top-k results with random-projection LSH lookup."""
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 10000,
+        threshold: float = 0.97,
+        num_tables: int = 8,
+        num_bits: int = 16,
+        seed: int = 0
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            dimension: Embedding dimension
+            capacity: Maximum number of cached queries (LRU eviction)
+            threshold: Minimum cosine similarity for a hit
+            num_tables: Number of hash tables; more tables raise recall
+            num_bits: Hyperplanes per table; more bits make buckets smaller
+            seed: Seed for the random hyperplanes
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.num_tables = num_tables
+
+        rng = np.random.default_rng(seed)
+        self._planes = np.ascontiguousarray(
+            rng.standard_normal((num_tables, num_bits, dimension)), dtype=np.float32
+        )
+        self._flat_planes = self._planes.reshape(num_tables * num_bits, dimension)
+        self._bit_weights = (1 << np.arange(num_bits, dtype=np.int64))
+
+        self._tables: List[Dict[int, Set[int]]] = [{} for _ in range(num_tables)]
+        self._entries: "OrderedDict[int, _LSHEntry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _buckets(self, embedding: np.ndarray) -> np.ndarray:
+        """Bucket id of the embedding in each table."""
+        if _signatures is not None:
+            return _signatures(embedding, self._planes)
+        bits = (self._flat_planes @ embedding) > 0
+        return bits.reshape(self.num_tables, -1) @ self._bit_weights
+
+    def get(self, embedding: np.ndarray, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up results cached for a near-identical query.
+
+        Args:
+            embedding: L2-normalized query embedding
+            top_k: Number of results the caller needs
+
+        Returns:
+            The first `top_k` cached results, or None on a miss
+        """
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+        buckets = self._buckets(embedding)
+
+        with self._lock:
+            candidates = set()
+            for table, bucket in zip(self._tables, buckets.tolist()):
+                candidates.update(table.get(bucket, ()))
+            candidates = [
+                entry_id for entry_id in candidates
+                if self._entries[entry_id].top_k >= top_k
+            ]
+            if not candidates:
+                return None
+
+            # Vectors are normalized, so the dot product is cosine similarity
+            matrix = np.stack([self._entries[entry_id].embedding for entry_id in candidates])
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            entry_id = candidates[best]
+            self._entries.move_to_end(entry_id)
+            return list(self._entries[entry_id].results[:top_k])
+
+    def put(self, embedding: np.ndarray, top_k: int, results: List[Dict[str, Any]]) -> None:
+        """
+        Cache the results retrieved for a query.
+
+        Args:
+            embedding: L2-normalized query embedding
+            top_k: Number of results that were requested
+            results: Retrieved chunks for the query
+        """
+        embedding = np.array(embedding, dtype=np.float32)
+        entry = _LSHEntry(embedding, self._buckets(embedding), top_k, list(results))
+
+        with self._lock:
+            if len(self._entries) >= self.capacity:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._unlink(evicted_id, evicted)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            for table, bucket in zip(self._tables, entry.buckets.tolist()):
+                table.setdefault(bucket, set()).add(entry_id)
+
+    def _unlink(self, entry_id: int, entry: _LSHEntry) -> None:
+        """Remove an entry from every bucket it was filed under."""
+        for table, bucket in zip(self._tables, entry.buckets.tolist()):
+            members = table.get(bucket)
+            if members is not None:
+                members.discard(entry_id)
+                if not members:
+                    del table[bucket]
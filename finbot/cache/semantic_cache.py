@@ -0,0 +1,164 @@
+"""
+Semantic Query Cache
+
+Two-tier cache for interactive queries. The exact tier matches the
+normalized query string; the semantic tier matches any cached query whose
+embedding has cosine similarity above a threshold. Hits skip retrieval;
+exact hits also skip embedding and may replay the cached answer.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    """Cached retrieval result (and optionally answer) for one query."""
+    embedding: np.ndarray
+    chunks: List[Dict[str, Any]]
+    answer: Optional[str] = None
+    stored_at: float = 0.0  # time.time() when cached; orders persisted entries
+
+
+def query_key(query: str) -> str:
+    """Hash a query string after whitespace and case normalization."""
+    normalized = " ".join(query.lower().split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """LRU query cache with an exact-match tier and a cosine-similarity tier."""
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 512,
+        threshold: float = 0.95,
+        persist_dir: Optional[str] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            dimension: Embedding dimension
+            capacity: Maximum number of cached queries (LRU eviction);
+                      0 disables the cache
+            threshold: Minimum cosine similarity for a semantic hit
+            persist_dir: Optional diskcache directory for cross-session hits
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+
+        # Embeddings live in a preallocated matrix so lookup is a single GEMV
+        self._matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        self._row_keys: List[Optional[str]] = [None] * capacity
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._payloads: Dict[str, CacheEntry] = {}
+
+        self._store = None
+        if persist_dir:
+            from diskcache import Cache
+            self._store = Cache(persist_dir)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str) -> Optional[CacheEntry]:
+        """Exact-tier lookup by normalized query string."""
+        key = query_key(query)
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._payloads[key]
+
+    def search(self, embedding: np.ndarray) -> Optional[CacheEntry]:
+        """
+        Semantic-tier lookup by query embedding.
+
+        Args:
+            embedding: L2-normalized query embedding
+
+        Returns:
+            Most similar cached entry above the threshold, or None
+        """
+        if not self._entries:
+            return None
+
+        # Vectors are normalized, so the dot product is cosine similarity
+        scores = self._matrix @ embedding.astype(np.float32, copy=False)
+        row = int(np.argmax(scores))
+        key = self._row_keys[row]
+        if key is None or scores[row] < self.threshold:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._payloads[key]
+
+    def put(
+        self,
+        query: str,
+        embedding: np.ndarray,
+        chunks: List[Dict[str, Any]],
+        answer: Optional[str] = None
+    ) -> None:
+        """
+        Cache the retrieval result and answer for a query.
+
+        Args:
+            query: Raw query string
+            embedding: L2-normalized query embedding
+            chunks: Retrieved chunks for the query
+            answer: Generated answer, if it should be reused
+        """
+        if self.capacity <= 0:
+            return
+        key = query_key(query)
+        entry = CacheEntry(
+            np.asarray(embedding, dtype=np.float32), chunks, answer, stored_at=time.time()
+        )
+        self._insert(key, entry)
+        if self._store is not None:
+            self._store.set(key, entry)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        """Place an entry in the matrix, evicting the LRU entry when full."""
+        if self.capacity <= 0:
+            return
+        if key in self._entries:
+            row = self._entries[key]
+            self._entries.move_to_end(key)
+        elif len(self._entries) < self.capacity:
+            row = len(self._entries)
+            self._entries[key] = row
+        else:
+            evicted_key, row = self._entries.popitem(last=False)
+            del self._payloads[evicted_key]
+            if self._store is not None:
+                self._store.delete(evicted_key)
+            self._entries[key] = row
+
+        self._matrix[row] = entry.embedding
+        self._row_keys[row] = key
+        self._payloads[key] = entry
+
+    def _load(self) -> None:
+        """Load the `capacity` most recently stored entries, dropping the rest."""
+        entries = []
+        for key in list(self._store.iterkeys()):
+            entry = self._store.get(key)
+            if entry is not None:
+                entries.append((key, entry))
+
+        # diskcache iterates in key order (md5 hashes), not insertion order
+        entries.sort(key=lambda item: getattr(item[1], "stored_at", 0.0))
+        stale = max(len(entries) - max(self.capacity, 0), 0)
+        for key, _ in entries[:stale]:
+            self._store.delete(key)
+        for key, entry in entries[stale:]:
+            self._insert(key, entry)
@@ -13,18 +13,30 @@ warnings.filterwarnings("ignore")
 
 from rich import print
 from rich.prompt import Prompt
-from finbot.ingestion.ingest import ingest
-from finbot.embedding.embedder import embed
-from finbot.retriever.similarity import retrieve_similar, rerank_chunks
-from finbot.prompt.formatter import build_prompt
-from finbot.llm import get_llm
-from finbot.config import TOP_K, MAX_RESPONSE_TOKENS, LLM_BACKEND
+from finbot.config import (
+    TOP_K, LLM_BACKEND, EMBED_DIMENSION,
+    SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_DIR
+)
 import time
 
 
 def interactive():
     """Run interactive Q&A session with the financial assistant."""
+    # Heavy dependencies (torch, llama.cpp, psycopg2) load only when needed
+    from finbot.embedding.embedder import embed_query
+    from finbot.retriever.similarity import retrieve_similar, rerank_chunks
+    from finbot.prompt.formatter import build_prompt
+    from finbot.llm import get_llm
+    from finbot.cache.semantic_cache import SemanticCache
+    from finbot.db.client import close_pool
+    
     llm = get_llm()
+    cache = SemanticCache(
+        EMBED_DIMENSION,
+        capacity=SEMANTIC_CACHE_SIZE,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        persist_dir=SEMANTIC_CACHE_DIR
+    )
     print("[bold green]FinBot ready > Ask questions about Canadian finance[/bold green]")
     
     while True:
@@ -33,42 +45,59 @@ def interactive():
             if query.lower() in {"exit", "quit"}:
                 break
                 
-            # Embedding
-            query_embedding = embed([query])[0]
-            # Retrieval (vector search)
             start_time = time.time()
-            similar_chunks = retrieve_similar(query_embedding, TOP_K)
-            # Optional reranking for cloud backends
-            if LLM_BACKEND in {"openai", "hf_hub"}:
-                similar_chunks = rerank_chunks(query, similar_chunks, TOP_K)
-            latency_ms = (time.time() - start_time) * 1000
-            print(f"[dim]Retrieval+Rerank latency: {latency_ms:.0f} ms[/dim]")
+            # Exact-match cache tier skips embedding entirely
+            cached = cache.get(query)
+            exact_hit = cached is not None
+            query_embedding = None
+            if cached is None:
+                # Embedding
+                query_embedding = embed_query(query)
+                cached = cache.search(query_embedding)
+            
+            if cached is not None:
+                similar_chunks = cached.chunks
+                print(f"[dim]Cache hit: {(time.time() - start_time) * 1000:.0f} ms[/dim]")
+            else:
+                # Retrieval (vector search)
+                similar_chunks = retrieve_similar(query_embedding, TOP_K)
+                # Optional reranking for cloud backends
+                if LLM_BACKEND in {"openai", "hf_hub"}:
+                    similar_chunks = rerank_chunks(query, similar_chunks, TOP_K)
+                latency_ms = (time.time() - start_time) * 1000
+                print(f"[dim]Retrieval+Rerank latency: {latency_ms:.0f} ms[/dim]")
             
             if not similar_chunks:
                 print("[yellow]No relevant documents found for your question.[/yellow]")
                 continue
-                
-            prompt = build_prompt(query, similar_chunks)
             
             print("\n[bold blue]Answer:[/bold blue]")
-            response_tokens = []
-            token_count = 0
-            max_response_tokens = MAX_RESPONSE_TOKENS
             
-            # Response generation (streaming)
-            gen_start = time.time()
-            for token in llm.stream(prompt):
-                print(token, end="", flush=True)
-                response_tokens.append(token)
-                token_count += len(token.split())
+            if exact_hit and cached.answer:
+                # Reuse the answer streamed for the same query. Semantic hits
+                # only reuse the chunks: near-identical questions can differ
+                # in a year or amount that changes the answer
+                print(cached.answer, end="", flush=True)
+            else:
+                prompt = build_prompt(query, similar_chunks)
+                response_tokens = []
+                
+                # Response generation (streaming); backends cap the length
+                # at MAX_RESPONSE_TOKENS model tokens
+                gen_start = time.time()
+                for token in llm.stream(prompt):
+                    print(token, end="", flush=True)
+                    response_tokens.append(token)
+                
+                gen_latency = (time.time() - gen_start) * 1000
+                print(f"[dim]Generation latency: {gen_latency:.0f} ms[/dim]")
                 
-                # Prevent excessively long responses
-                if token_count > max_response_tokens:
-                    print("\n[dim]...(response truncated)[/dim]")
-                    break
+                if query_embedding is not None:
+                    answer = "".join(response_tokens)
+                    # Failed generations are not worth replaying
+                    reusable = not answer.startswith("Error:")
+                    cache.put(query, query_embedding, similar_chunks, answer if reusable else None)
             
-            gen_latency = (time.time() - gen_start) * 1000
-            print(f"[dim]Generation latency: {gen_latency:.0f} ms[/dim]")
             # Display source attribution
             if similar_chunks:
                 source = similar_chunks[0].get('source', 'Unknown')
@@ -80,6 +109,9 @@ def interactive():
             break
         except Exception as e:
             print(f"[red]Error:[/red] {e}")
+    
+    # Release pooled database connections before exit
+    close_pool()
 
 
 def main():
@@ -93,11 +125,22 @@ def main():
         action="store_true",
         help="Ingest documents from data/raw/ directory"
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="With --ingest: drop the similarity search indexes during the "
+             "load and rebuild them once afterwards (faster for large loads)"
+    )
     
     args = parser.parse_args()
     
     if args.ingest:
-        ingest()
+        from finbot.ingestion.ingest import ingest
+        from finbot.db.client import close_pool
+        try:
+            ingest(bulk=args.bulk)
+        finally:
+            close_pool()
     else:
         interactive()
 
@@ -6,6 +6,7 @@ Validates configuration on startup to ensure proper setup.
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,9 +18,22 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Database configuration
 DB_URI = os.getenv("DATABASE_URL", "postgresql:///finbot")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 2))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 16))
 
 # Embedding model configuration
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# Supported embedding backends: onnx, sentence_transformers
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "onnx")
+EMBED_DIMENSION = int(os.getenv("EMBED_DIMENSION", 384))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 128))
+# Longest input (in tokens) the embedding model encodes; longer text is truncated
+EMBED_MAX_SEQ_LENGTH = int(os.getenv("EMBED_MAX_SEQ_LENGTH", 256))
+# Compute precision for the sentence_transformers backend: float32, bfloat16, float16
+EMBED_PRECISION = os.getenv("EMBED_PRECISION", "float32")
+MODEL_CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", BASE_DIR / "models"))
+# On-disk cache of chunk embeddings reused across ingests (empty disables)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", str(BASE_DIR / ".cache" / "embeddings.sqlite"))
 
 # LLM backend configuration
 # Supported backends: llama_cpp, openai, hf_hub
@@ -30,15 +44,56 @@ LLAMA_PATH = os.getenv("LLAMA_PATH")  # Path to GGUF model file
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 HF_MODEL = os.getenv("HF_MODEL")  # HuggingFace model repository name
 
-# Document processing parameters
+# llama.cpp runtime settings
+LLAMA_N_THREADS = int(os.getenv("LLAMA_N_THREADS", os.cpu_count() or 4))
+LLAMA_N_THREADS_BATCH = int(os.getenv("LLAMA_N_THREADS_BATCH", os.cpu_count() or 4))
+LLAMA_N_BATCH = int(os.getenv("LLAMA_N_BATCH", 1024))
+# Unset auto-detects GPU offload support (-1 = all layers, 0 = CPU only)
+LLAMA_N_GPU_LAYERS = int(os.environ["LLAMA_N_GPU_LAYERS"]) if os.getenv("LLAMA_N_GPU_LAYERS") else None
+LLAMA_FLASH_ATTN = os.getenv("LLAMA_FLASH_ATTN", "1").lower() in {"1", "true", "yes"}
+
+# Document processing parameters (measured in embedding-model tokens)
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 200))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 50))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 0))  # 0 uses all CPU cores
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 512))  # Chunks per embed/store batch
 
 # Retrieval and response parameters
 TOP_K = int(os.getenv("TOP_K", 4))
+# Chunks of at most CONTEXT_MIN_CHARS are dropped from the context and
+# chunks longer than CONTEXT_MAX_CHARS are truncated (both applied in the
+# retrieval query, so changes take effect without re-ingesting)
+CONTEXT_MIN_CHARS = int(os.getenv("CONTEXT_MIN_CHARS", 50))
+CONTEXT_MAX_CHARS = int(os.getenv("CONTEXT_MAX_CHARS", 400))
+
+# HNSW approximate nearest neighbour index parameters
+HNSW_M = int(os.getenv("HNSW_M", 16))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 64))
+ANN_EF_SEARCH = int(os.getenv("ANN_EF_SEARCH", 40))
+# Candidates fetched by the binary (Hamming) prefilter before exact cosine
+# reranking (max 1000). 1-bit sketches are coarse: on 50k clustered 384-d
+# vectors sharing a mean direction, recall@4 was 0.36 at 16 candidates,
+# 0.93 at 400 and 0.97 at 1000
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", 400))
+
+# In-process LSH cache of retrieval results (0 disables)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", 10000))
+RETRIEVAL_CACHE_THRESHOLD = float(os.getenv("RETRIEVAL_CACHE_THRESHOLD", 0.97))
+
+# Reranking (openai/hf_hub backends)
+# Supported rerank backends: onnx (local INT8 cross-encoder),
+# cross_encoder (sentence-transformers CrossEncoder), llm (OpenAI chat model)
+RERANK_BACKEND = os.getenv("RERANK_BACKEND", "onnx")
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", 16))
 MAX_RESPONSE_TOKENS = int(os.getenv("MAX_RESPONSE_TOKENS", 128))
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", 0.3))
 
+# Semantic query cache for interactive mode
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", 512))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR")  # Unset disables persistence
+
 # Stop sequences for response generation
 STOP_SEQUENCE = ["### Question", "### Answer", "\n\n---", "Source:", "<|eot_id|>", "</s>"]
 
@@ -66,12 +121,30 @@ def validate_config():
         if not HF_MODEL:
             errors.append("HF_MODEL is required when using hf_hub backend")
     
+    if CHUNK_SIZE <= CHUNK_OVERLAP:
+        errors.append(f"CHUNK_SIZE ({CHUNK_SIZE}) must be greater than CHUNK_OVERLAP ({CHUNK_OVERLAP})")
+    
+    if EMBED_BACKEND not in {"onnx", "sentence_transformers"}:
+        errors.append(f"Unsupported EMBED_BACKEND: {EMBED_BACKEND}")
+    
+    if CONTEXT_MAX_CHARS <= CONTEXT_MIN_CHARS:
+        errors.append(f"CONTEXT_MAX_CHARS ({CONTEXT_MAX_CHARS}) must be greater than CONTEXT_MIN_CHARS ({CONTEXT_MIN_CHARS})")
+    
+    if not 1 <= RETRIEVAL_CANDIDATES <= 1000:
+        errors.append("RETRIEVAL_CANDIDATES must be between 1 and 1000 (hnsw.ef_search limit)")
+    
+    if RERANK_BACKEND not in {"onnx", "cross_encoder", "llm"}:
+        errors.append(f"Unsupported RERANK_BACKEND: {RERANK_BACKEND}")
+    
+    if EMBED_PRECISION not in {"float32", "bfloat16", "float16"}:
+        errors.append(f"Unsupported EMBED_PRECISION: {EMBED_PRECISION}")
+    
     if errors:
         error_message = "Configuration validation failed:\n" + "\n".join(f"- {err}" for err in errors)
         raise ValueError(error_message)
 
 
 # Validate configuration on module import
-# Can be disabled by setting SKIP_CONFIG_VALIDATION=1
-if not os.getenv("SKIP_CONFIG_VALIDATION"):
+# Can be disabled by setting SKIP_CONFIG_VALIDATION=1; skipped for --help
+if not os.getenv("SKIP_CONFIG_VALIDATION") and not {"-h", "--help"} & set(sys.argv[1:]):
     validate_config()
@@ -5,31 +5,180 @@ Handles PostgreSQL operations with pgvector for storing and retrieving
 document embeddings. Provides connection management and data persistence.
 """
 
+import io
+import json
+import struct
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+
 import psycopg2
+import psycopg2.errors
 from pgvector.psycopg2 import register_vector
-from psycopg2.extras import Json
-from typing import List, Dict, Any
+from psycopg2.pool import ThreadedConnectionPool
 import numpy as np
 
-from finbot.config import DB_URI
+from finbot.config import (
+    DB_URI, DB_POOL_MIN, DB_POOL_MAX, EMBED_DIMENSION, HNSW_M, HNSW_EF_CONSTRUCTION,
+    CONTEXT_MIN_CHARS, CONTEXT_MAX_CHARS
+)
 
+# PostgreSQL binary COPY framing: signature, flags and header extension
+# length, then per tuple a field count and length-prefixed fields
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+COPY_SQL = "COPY documents (source, chunk, metadata, embedding) FROM STDIN WITH (FORMAT BINARY)"
+_FIELD_COUNT = struct.pack(">h", 4)
+_FIELD_LENGTH = struct.Struct(">i")
+_HALFVEC_HEADER = struct.Struct(">HH")
+_JSONB_VERSION = b"\x01"
 
-def get_connection():
+# HNSW indexes for approximate nearest neighbour search: cosine distance on
+# the embeddings and Hamming distance on their binary-quantized sketches
+ANN_INDEX_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_embedding
+    ON documents USING hnsw (embedding halfvec_cosine_ops)
+    WITH (m = %s, ef_construction = %s);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_embedding_bits
+    ON documents USING hnsw (embedding_bits bit_hamming_ops)
+    WITH (m = %s, ef_construction = %s);
+    """,
+]
+
+# Relations loaded into shared_buffers after (re)building the indexes. The
+# heap goes first: if it is as large as shared_buffers, loading it last
+# would evict the index pages, which every search touches
+PREWARM_RELATIONS = ["documents", "idx_embedding", "idx_embedding_bits"]
+
+# Prompt-ready chunk text, mirroring formatter.prepare_context; chunks are
+# stored stripped, so only the truncation is left. Computed at query time,
+# so CONTEXT_MAX_CHARS takes effect without touching the table
+CONTEXT_SQL = (
+    f"CASE WHEN chunk_len > {CONTEXT_MAX_CHARS} "
+    f"THEN left(chunk, {CONTEXT_MAX_CHARS}) || '...' ELSE chunk END"
+)
+
+# Top-k similarity search, prepared once per pooled connection so repeat
+# queries skip parsing and planning and bind the query vector only once.
+# Stage one takes $3 candidates by Hamming distance on the 1-bit sketches,
+# stage two reranks them by exact cosine distance. Rows come back as jsonb,
+# which psycopg2 decodes straight into result dicts. Chunks too short for
+# the prompt are skipped in SQL, and only the prompt-ready (truncated) text
+# is sent back.
+TOPK_STATEMENT = "finbot_topk"
+TOPK_SQL = f"""
+    PREPARE {TOPK_STATEMENT} (halfvec, int, int) AS
+    WITH candidates AS (
+        SELECT id, chunk, chunk_len, metadata, source, embedding
+        FROM documents
+        WHERE chunk_len > {CONTEXT_MIN_CHARS}
+        ORDER BY embedding_bits <~> binary_quantize($1)::bit({EMBED_DIMENSION})
+        LIMIT $3
+    )
+    SELECT jsonb_build_object(
+        'id', id, 'chunk', {CONTEXT_SQL}, 'metadata', metadata, 'source', source,
+        'score', embedding <=> $1
+    )
+    FROM candidates
+    ORDER BY embedding <=> $1
+    LIMIT $2;
+"""
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class VectorConnectionPool(ThreadedConnectionPool):
+    """
+    Connection pool that sets up each connection once when it is opened:
+    pgvector types are registered and the retrieval statement is prepared.
     """
-    Create a PostgreSQL connection with pgvector support.
+    
+    def _connect(self, key=None):
+        connection = super()._connect(key)
+        register_vector(connection)
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(TOPK_SQL)
+            except (psycopg2.errors.UndefinedTable, psycopg2.errors.UndefinedColumn):
+                # Database not initialized (or migrated) yet; only retrieval needs it
+                connection.rollback()
+        connection.commit()
+        return connection
+
+
+def get_pool() -> VectorConnectionPool:
+    """
+    Get the process-wide connection pool, creating it on first use.
     
     Returns:
-        psycopg2 connection object
+        Shared VectorConnectionPool instance
         
     Raises:
         ConnectionError: If database connection fails
     """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = VectorConnectionPool(DB_POOL_MIN, DB_POOL_MAX, dsn=DB_URI)
+                except psycopg2.Error as e:
+                    raise ConnectionError(f"Failed to connect to database: {e}")
+    return _pool
+
+
+@contextmanager
+def db_conn() -> Iterator[psycopg2.extensions.connection]:
+    """
+    Borrow a pooled PostgreSQL connection with pgvector support.
+    
+    Yields:
+        psycopg2 connection object; returned to the pool on exit
+        
+    Raises:
+        ConnectionError: If database connection fails
+        
+    Note:
+        Uncommitted work is rolled back when the connection is returned.
+    """
+    pool = get_pool()
     try:
-        connection = psycopg2.connect(DB_URI)
-        register_vector(connection)
-        return connection
+        connection = pool.getconn()
     except psycopg2.Error as e:
         raise ConnectionError(f"Failed to connect to database: {e}")
+    
+    try:
+        yield connection
+    except Exception:
+        if not connection.closed:
+            connection.rollback()
+        raise
+    finally:
+        pool.putconn(connection, close=bool(connection.closed))
+
+
+def set_search_options(cursor, ef_search: int):
+    """
+    Apply per-transaction search settings.
+    
+    Args:
+        cursor: Cursor inside the transaction that runs the search
+        ef_search: HNSW candidate list size
+    """
+    cursor.execute("SET LOCAL hnsw.ef_search = %s;", (ef_search,))
+
+
+def close_pool():
+    """Close all pooled connections."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
 
 
 def upsert_chunks(chunks_with_metadata: List[Dict[str, Any]], embeddings: np.ndarray):
@@ -47,30 +196,140 @@ def upsert_chunks(chunks_with_metadata: List[Dict[str, Any]], embeddings: np.nda
     """
     if not chunks_with_metadata or len(chunks_with_metadata) == 0:
         raise ValueError("No chunks provided for database insertion")
-        
-    connection = get_connection()
-    cursor = None
     
-    try:
-        cursor = connection.cursor()
+    bulk_load_embeddings(
+        (metadata["source"], metadata["chunk"], metadata.get("metadata", {}), embedding)
+        for metadata, embedding in zip(chunks_with_metadata, embeddings)
+    )
+
+
+def bulk_load_embeddings(rows: Iterable[Tuple[str, str, Dict[str, Any], np.ndarray]]) -> int:
+    """
+    Load rows into the documents table with a single binary COPY.
+    
+    Args:
+        rows: (source, chunk, metadata, embedding) tuples
+        
+    Returns:
+        Number of rows loaded
         
-        for metadata, embedding in zip(chunks_with_metadata, embeddings):
-            cursor.execute("""
-                INSERT INTO documents (source, chunk, metadata, embedding)
-                VALUES (%s, %s, %s, %s)
-            """, (
-                metadata["source"], 
-                metadata["chunk"], 
-                Json(metadata.get("metadata", {})), 
-                embedding.tolist()
-            ))
+    Note:
+        Embeddings are sent in pgvector's binary halfvec format, so no
+        float is ever formatted as text. Drop the ANN indexes before a large
+        load (see drop_ann_indexes) to avoid per-row index maintenance.
         
+    Raises:
+        psycopg2.Error: If database operation fails
+    """
+    buffer, count = encode_copy_rows(rows)
+    
+    with db_conn() as connection, connection.cursor() as cursor:
+        cursor.copy_expert(COPY_SQL, buffer)
         connection.commit()
+    
+    return count
+
+
+def encode_copy_rows(
+    rows: Iterable[Tuple[str, str, Dict[str, Any], np.ndarray]]
+) -> Tuple[io.BytesIO, int]:
+    """
+    Encode rows as a PostgreSQL binary COPY stream for COPY_SQL.
+    
+    Args:
+        rows: (source, chunk, metadata, embedding) tuples
         
-    except Exception as e:
+    Returns:
+        (buffer positioned at the start, number of rows encoded)
+    """
+    buffer = io.BytesIO()
+    write = buffer.write
+    write(COPY_HEADER)
+    
+    count = 0
+    for source, chunk, metadata, embedding in rows:
+        embedding = np.asarray(embedding, dtype=">f2")
+        fields = (
+            source.encode("utf-8"),
+            chunk.encode("utf-8"),
+            _JSONB_VERSION + json.dumps(metadata).encode("utf-8"),
+            _HALFVEC_HEADER.pack(embedding.shape[0], 0) + embedding.tobytes()
+        )
+        write(_FIELD_COUNT)
+        for field in fields:
+            write(_FIELD_LENGTH.pack(len(field)))
+            write(field)
+        count += 1
+    
+    write(COPY_TRAILER)
+    buffer.seek(0)
+    return buffer, count
+
+
+def create_ann_index(cursor):
+    """
+    Create the HNSW indexes if they do not exist yet.
+    
+    Args:
+        cursor: Cursor on an open connection; the caller commits
+    """
+    for index_sql in ANN_INDEX_SQL:
+        cursor.execute(index_sql, (HNSW_M, HNSW_EF_CONSTRUCTION))
+
+
+def prewarm_relations(connection) -> bool:
+    """
+    Load the documents table, then the ANN indexes, into shared_buffers.
+    
+    Without this the first queries after an index build pay a page fault
+    for every HNSW layer they touch.
+    
+    Args:
+        connection: Open connection with no transaction in progress
+        
+    Returns:
+        True if prewarming ran, False if pg_prewarm is unavailable
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_prewarm;")
+            for relation in PREWARM_RELATIONS:
+                cursor.execute("SELECT pg_prewarm(%s);", (relation,))
+        connection.commit()
+        return True
+    except psycopg2.Error as e:
         connection.rollback()
-        raise e
-    finally:
-        if cursor:
-            cursor.close()
-        connection.close()
\ No newline at end of file
+        print(f"Skipping pg_prewarm: {e}")
+        return False
+
+
+def drop_ann_indexes():
+    """
+    Drop the HNSW indexes ahead of a bulk load.
+    
+    With the indexes in place every COPY'd row is inserted into both HNSW
+    graphs one at a time; dropping them first and calling build_ann_index
+    after the load builds each graph once instead.
+    
+    Raises:
+        psycopg2.Error: If the indexes cannot be dropped
+    """
+    with db_conn() as connection, connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS idx_embedding, idx_embedding_bits;")
+        connection.commit()
+
+
+def build_ann_index():
+    """
+    Build the HNSW indexes used for approximate nearest neighbour search.
+    
+    Indexes that already exist are left as they are, so this is cheap
+    unless drop_ann_indexes ran before the load.
+    
+    Raises:
+        psycopg2.Error: If index creation fails
+    """
+    with db_conn() as connection, connection.cursor() as cursor:
+        create_ann_index(cursor)
+        connection.commit()
+        prewarm_relations(connection)
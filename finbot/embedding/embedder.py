@@ -2,30 +2,66 @@
 Text Embedding Module
 
 Handles text embedding generation using sentence-transformers models.
-Provides caching for efficient model reuse across multiple embedding calls.
+Supports a quantized ONNX Runtime backend (default) and the PyTorch
+sentence-transformers backend. Provides caching for efficient model reuse
+across multiple embedding calls.
 """
 
+from contextlib import ExitStack
 from functools import lru_cache
 from typing import List
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-from finbot.config import EMBED_MODEL
+from finbot.config import (
+    EMBED_MODEL, EMBED_BACKEND, MODEL_CACHE_DIR, EMBED_BATCH_SIZE, EMBED_PRECISION,
+    EMBED_MAX_SEQ_LENGTH
+)
 
 
 @lru_cache(maxsize=1)
-def get_embedding_model() -> SentenceTransformer:
+def get_embedding_model():
     """
-    Get the sentence transformer model with caching.
+    Get the embedding model for the configured backend with caching.
     
     Returns:
-        Loaded SentenceTransformer model
+        OnnxEmbeddingModel (onnx backend) or SentenceTransformer model
         
     Note:
-        Model is cached after first load for efficiency.
+        Model is cached after first load for efficiency. The onnx backend
+        exports and quantizes the model on first use.
     """
-    return SentenceTransformer(EMBED_MODEL)
+    if EMBED_BACKEND == "onnx":
+        from .onnx_model import OnnxEmbeddingModel
+        return OnnxEmbeddingModel(EMBED_MODEL, MODEL_CACHE_DIR, EMBED_MAX_SEQ_LENGTH)
+    
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(EMBED_MODEL)
+    model.max_seq_length = EMBED_MAX_SEQ_LENGTH
+    
+    # Half precision weights only pay off on GPU
+    if EMBED_PRECISION == "float16" and model.device.type == "cuda":
+        model.half()
+    return model
+
+
+def _inference_context() -> ExitStack:
+    """
+    Build the PyTorch inference context for the sentence_transformers backend.
+    
+    Returns:
+        ExitStack with inference mode and, for bfloat16 precision on CPU,
+        autocast enabled. Empty for the onnx backend.
+    """
+    stack = ExitStack()
+    if EMBED_BACKEND != "sentence_transformers":
+        return stack
+    
+    import torch
+    stack.enter_context(torch.inference_mode())
+    if EMBED_PRECISION == "bfloat16":
+        stack.enter_context(torch.autocast(device_type="cpu", dtype=torch.bfloat16))
+    return stack
 
 
 def embed(texts: List[str]) -> np.ndarray:
@@ -39,18 +75,44 @@ def embed(texts: List[str]) -> np.ndarray:
         NumPy array of embeddings with shape (len(texts), embedding_dim)
         
     Note:
-        Embeddings are normalized for cosine similarity calculations.
+        Embeddings are normalized for cosine similarity calculations and
+        always returned as float32, whatever the compute precision.
     """
     if not texts:
         return np.array([])
     
     model = get_embedding_model()
     
-    embeddings = model.encode(
-        texts,
-        show_progress_bar=False,
-        convert_to_numpy=True,
-        normalize_embeddings=True
-    )
+    with _inference_context():
+        embeddings = model.encode(
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
     
-    return embeddings
+    return embeddings.astype(np.float32, copy=False)
+
+
+@lru_cache(maxsize=1024)
+def _embed_one(text: str) -> bytes:
+    """Embed a single text; bytes keep the cached value immutable."""
+    return embed([text])[0].astype(np.float32).tobytes()
+
+
+def embed_query(text: str) -> np.ndarray:
+    """
+    Generate the embedding for a single query string.
+    
+    Args:
+        text: Query text
+        
+    Returns:
+        Read-only float32 embedding vector
+        
+    Note:
+        Results for the last 1024 distinct queries are cached in memory,
+        so repeated queries skip tokenization and inference entirely.
+    """
+    return np.frombuffer(_embed_one(text), dtype=np.float32)
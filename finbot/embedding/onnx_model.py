@@ -0,0 +1,135 @@
+"""
+ONNX Embedding Backend
+
+Runs sentence-transformers models through ONNX Runtime with dynamic INT8
+quantization. On CPU this is several times faster than the PyTorch backend
+while producing near-identical embeddings.
+"""
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def export_quantized_model(
+    model_name: str,
+    model_dir: Path,
+    model_class_name: str = "ORTModelForFeatureExtraction"
+) -> Path:
+    """
+    Export a HuggingFace model to ONNX and quantize it to INT8.
+
+    Args:
+        model_name: HuggingFace model repository name
+        model_dir: Directory where the exported model is stored
+        model_class_name: optimum.onnxruntime model class used for export
+
+    Returns:
+        Path to the quantized ONNX model file
+
+    Note:
+        The export only runs once; later calls reuse the cached file.
+    """
+    quantized_path = model_dir / QUANTIZED_FILE_NAME
+    if quantized_path.exists():
+        return quantized_path
+
+    # Export tooling is only needed on the first run
+    import optimum.onnxruntime as ort_models
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    model_class = getattr(ort_models, model_class_name)
+    model = model_class.from_pretrained(model_name, export=True)
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+    # Dynamic quantization needs no calibration data
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+
+    return quantized_path
+
+
+class OnnxEmbeddingModel:
+    """Quantized ONNX Runtime model with a SentenceTransformer-style encode()."""
+
+    def __init__(self, model_name: str, cache_dir: Path, max_seq_length: int = 256):
+        """
+        Load (exporting on first use) the quantized ONNX model.
+
+        Args:
+            model_name: HuggingFace model repository name
+            cache_dir: Directory for exported ONNX models
+            max_seq_length: Maximum number of tokens per input text
+        """
+        model_dir = Path(cache_dir) / model_name.replace("/", "__")
+        model_path = export_quantized_model(model_name, model_dir)
+
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Generate embeddings using mean pooling over token embeddings.
+
+        Args:
+            texts: List of text strings to embed
+            batch_size: Number of texts per inference call
+            normalize_embeddings: L2-normalize the output vectors
+            **kwargs: Accepted for SentenceTransformer compatibility
+
+        Returns:
+            NumPy float32 array with shape (len(texts), embedding_dim)
+
+        Note:
+            Texts are batched in length order to minimize padding and the
+            original order is restored before returning.
+        """
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+
+        batches = []
+        for start in range(0, len(sorted_texts), batch_size):
+            encoded = self.tokenizer(
+                sorted_texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feed = {
+                name: values.astype(np.int64)
+                for name, values in encoded.items()
+                if name in self.input_names
+            }
+            token_embeddings = self.session.run(None, feed)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(summed / counts)
+
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+
+        return embeddings
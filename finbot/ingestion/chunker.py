@@ -2,11 +2,36 @@
 Text Chunking Module
 
 Handles splitting large documents into smaller, overlapping chunks
-for efficient processing and retrieval.
+for efficient processing and retrieval. Chunks are measured in tokens of
+the embedding model's tokenizer so they always fit its input limit.
 """
 
+from functools import lru_cache
 from typing import List
 
+from finbot.config import EMBED_MODEL, EMBED_MAX_SEQ_LENGTH
+
+# Room for the [CLS]/[SEP] tokens the embedder adds
+_SPECIAL_TOKEN_COUNT = 2
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """
+    Get the embedding model's tokenizer with caching.
+    
+    Returns:
+        Fast HuggingFace tokenizer for EMBED_MODEL
+    """
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(EMBED_MODEL, use_fast=True)
+
+
+def max_chunk_tokens() -> int:
+    """Largest chunk, in tokens, the embedding model encodes without truncation."""
+    model_limit = min(get_tokenizer().model_max_length, EMBED_MAX_SEQ_LENGTH)
+    return model_limit - _SPECIAL_TOKEN_COUNT
+
 
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> List[str]:
     """
@@ -14,41 +39,69 @@ def chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> List[str
     
     Args:
         text: Input text to be chunked
-        chunk_size: Number of tokens (words) per chunk
+        chunk_size: Number of tokenizer tokens per chunk, capped at the
+                    embedding model's maximum sequence length
         overlap: Number of tokens to overlap between consecutive chunks
         
     Returns:
         List of text chunks as strings
         
+    Raises:
+        ValueError: If overlap is not smaller than chunk_size
+        
     Note:
-        Uses simple whitespace tokenization. For more sophisticated
-        tokenization, consider using specialized libraries like tiktoken.
+        Uses the embedding model's tokenizer, so no chunk is silently
+        truncated by the encoder. Chunks are slices of the original text
+        between token character offsets, so the source text is preserved
+        exactly rather than decoded from token ids. Window edges are moved
+        to word boundaries so no word is split across chunks; a chunk
+        therefore re-tokenizes to the same tokens it was cut from.
     """
+    chunk_size = min(chunk_size, max_chunk_tokens())
+    if chunk_size <= overlap:
+        raise ValueError(f"chunk_size ({chunk_size}) must be greater than overlap ({overlap})")
+    
     if not text or not text.strip():
         return []
     
-    # Simple whitespace tokenization
-    tokens = text.split()
+    # Character offsets of each embedding-model token
+    encoding = get_tokenizer()(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        verbose=False
+    )
+    spans = encoding["offset_mapping"]
+    token_count = len(spans)
     
-    if len(tokens) <= chunk_size:
+    if token_count <= chunk_size:
         return [text]
     
-    chunks = []
-    start_index = 0
+    # Tokens that begin a word (rather than continue a "##" word piece)
+    word_ids = encoding.word_ids()
+    word_start = [
+        index == 0 or word_ids[index] != word_ids[index - 1]
+        for index in range(token_count)
+    ]
     
-    while start_index < len(tokens):
-        end_index = start_index + chunk_size
-        chunk_tokens = tokens[start_index:end_index]
-        
-        # Join tokens back into text
-        chunk_text = " ".join(chunk_tokens)
-        chunks.append(chunk_text)
+    chunks = []
+    start = 0
+    while True:
+        end = min(start + chunk_size, token_count)
+        # Pull the end back to a word boundary; a single word longer than
+        # the window is cut where it is
+        boundary = end
+        while boundary < token_count and boundary > start and not word_start[boundary]:
+            boundary -= 1
+        if boundary > start:
+            end = boundary
         
-        # Move start index, accounting for overlap
-        start_index += chunk_size - overlap
+        chunks.append(text[spans[start][0]:spans[end - 1][1]])
+        if end == token_count:
+            return chunks
         
-        # Prevent infinite loop if overlap >= chunk_size
-        if start_index <= (start_index - chunk_size + overlap):
-            break
-    
-    return chunks
\ No newline at end of file
+        # Next window overlaps by up to `overlap` tokens, starting on a word
+        next_start = end - overlap
+        while next_start < end and not word_start[next_start]:
+            next_start += 1
+        start = next_start if next_start > start else end
@@ -5,16 +5,166 @@ Orchestrates the complete document ingestion pipeline including
 loading, chunking, embedding, and storing documents in the database.
 """
 
-from typing import List, Tuple
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
-from finbot.ingestion.loader import load_sources
+import numpy as np
+
+from finbot.ingestion.loader import iter_sources
 from finbot.ingestion.chunker import chunk_text
 from finbot.embedding.embedder import embed
-from finbot.db.client import upsert_chunks
-from finbot.config import CHUNK_SIZE, CHUNK_OVERLAP
+from finbot.cache.embed_cache import EmbeddingCache, chunk_hash
+from finbot.db.client import upsert_chunks, build_ann_index, drop_ann_indexes
+from finbot.config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, EMBED_MODEL, EMBED_DIMENSION, EMBED_CACHE_PATH,
+    INGEST_BATCH_SIZE
+)
+
+# Batches buffered between pipeline stages
+_PIPELINE_QUEUE_SIZE = 4
+_QUEUE_POLL_SECONDS = 0.1
+# Sentinel marking the end of a stage's input
+_STAGE_DONE = object()
+
+
+def _embed_unique(texts: List[str], hashes: List[str]) -> np.ndarray:
+    """
+    Embed distinct chunk texts, reusing cached embeddings where possible.
+    
+    Args:
+        texts: Distinct chunk strings
+        hashes: chunk_hash of each text
+        
+    Returns:
+        NumPy float32 array with shape (len(texts), EMBED_DIMENSION)
+        
+    Note:
+        Only chunks missing from the on-disk cache are embedded. New
+        embeddings are written back in a single transaction.
+    """
+    if not EMBED_CACHE_PATH:
+        return embed(texts)
+    
+    cache = EmbeddingCache(EMBED_CACHE_PATH, EMBED_DIMENSION)
+    try:
+        cached = cache.get_many(hashes)
+        
+        embeddings = np.empty((len(texts), EMBED_DIMENSION), dtype=np.float32)
+        miss_indices = []
+        for index, key in enumerate(hashes):
+            if key in cached:
+                embeddings[index] = cached[key]
+            else:
+                miss_indices.append(index)
+        
+        if miss_indices:
+            new_embeddings = embed([texts[index] for index in miss_indices])
+            embeddings[miss_indices] = new_embeddings
+            cache.put_many({hashes[index]: embeddings[index] for index in miss_indices})
+        
+        return embeddings
+    finally:
+        cache.close()
+
+
+def embed_chunks(chunk_texts: List[str]) -> np.ndarray:
+    """
+    Generate embeddings for chunks, embedding each distinct text only once.
+    
+    Args:
+        chunk_texts: List of chunk strings
+        
+    Returns:
+        NumPy float32 array with shape (len(chunk_texts), EMBED_DIMENSION)
+        
+    Note:
+        Repeated chunks (headers, footers, disclaimers shared across
+        documents) are deduplicated by hash before embedding.
+    """
+    unique_positions = {}
+    unique_texts = []
+    positions = []
+    
+    for text in chunk_texts:
+        key = chunk_hash(text, EMBED_MODEL)
+        if key not in unique_positions:
+            unique_positions[key] = len(unique_texts)
+            unique_texts.append(text)
+        positions.append(unique_positions[key])
+    
+    unique_embeddings = _embed_unique(unique_texts, list(unique_positions))
+    return unique_embeddings[positions]
+
+
+def _put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue unless the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
 
+def _get(source: queue.Queue, stop: threading.Event):
+    """Get the next item from a queue, or _STAGE_DONE if the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _STAGE_DONE
 
-def ingest(source_directory: str = "data/raw") -> None:
+
+def _embed_stage(inbox: queue.Queue, outbox: queue.Queue, stop: threading.Event) -> None:
+    """Embed chunk batches from inbox and pass (metadata, embeddings) on to outbox."""
+    try:
+        while True:
+            batch = _get(inbox, stop)
+            if batch is _STAGE_DONE:
+                break
+            embeddings = embed_chunks([item["chunk"] for item in batch])
+            if not _put(outbox, (batch, embeddings), stop):
+                break
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        _put(outbox, _STAGE_DONE, stop)
+
+
+def _store_stage(
+    inbox: queue.Queue,
+    stop: threading.Event,
+    on_first_batch: Optional[Callable[[], None]] = None
+) -> int:
+    """
+    Write embedded batches to the database; returns the number of chunks stored.
+    
+    on_first_batch, if given, runs once before the first batch is written.
+    """
+    stored = 0
+    try:
+        while True:
+            item = _get(inbox, stop)
+            if item is _STAGE_DONE:
+                break
+            batch, embeddings = item
+            if not stored and on_first_batch is not None:
+                on_first_batch()
+            upsert_chunks(batch, embeddings)
+            stored += len(batch)
+            print(f"Stored {stored} chunks...")
+    except BaseException:
+        stop.set()
+        raise
+    return stored
+
+
+def ingest(source_directory: str = "data/raw", bulk: bool = False) -> None:
     """
     Process and ingest documents from the specified directory.
     
@@ -24,53 +174,120 @@ def ingest(source_directory: str = "data/raw") -> None:
     3. Generates embeddings for each chunk
     4. Stores everything in the database
     
+    By default the HNSW indexes are maintained as rows are added, which
+    suits adding a few documents to an existing corpus. With bulk=True
+    they are dropped just before the first batch is stored and rebuilt
+    once afterwards (also when loading fails), which is faster for large
+    loads; searches fall back to sequential scans in the meantime. Nothing
+    is dropped or rebuilt if no chunks reach the database.
+    
+    Steps 2-4 run as a pipeline over batches of INGEST_BATCH_SIZE chunks
+    connected by bounded queues, so embedding overlaps database writes and
+    memory stays proportional to the batch size rather than the corpus.
+    
     Args:
         source_directory: Directory containing documents to process
+        bulk: Drop the similarity search indexes for the load and rebuild
+              them once afterwards
         
     Raises:
         Exception: If ingestion pipeline fails at any stage
     """
     print(f"Loading documents from {source_directory}...")
-    document_sources = load_sources(source_directory)
     
-    if not document_sources:
+    if not bulk:
+        stored_count, document_count, chunk_count = _run_pipeline(source_directory)
+    else:
+        dropped = threading.Event()
+        
+        def drop_indexes():
+            print("Dropping similarity search indexes for the bulk load...")
+            drop_ann_indexes()
+            dropped.set()
+        
+        try:
+            stored_count, document_count, chunk_count = _run_pipeline(
+                source_directory, on_first_batch=drop_indexes
+            )
+        finally:
+            if dropped.is_set():
+                print("Rebuilding similarity search indexes...")
+                build_ann_index()
+    
+    if not document_count:
         print("No documents found in the specified directory")
         return
     
-    print(f"Processing {len(document_sources)} documents...")
-    
-    # Prepare data structures for batch processing
-    chunk_texts = []
-    chunk_metadata = []
-    
-    # Process each document
-    for file_path, full_text in document_sources:
-        print(f"Processing: {file_path}")
-        
-        # Split document into manageable chunks
-        text_chunks = chunk_text(full_text, CHUNK_SIZE, CHUNK_OVERLAP)
-        
-        # Create metadata for each chunk
-        for chunk in text_chunks:
-            chunk_metadata.append({
-                "source": file_path,
-                "chunk": chunk,
-                "metadata": {}  # Additional metadata can be added here
-            })
-            chunk_texts.append(chunk)
-    
-    if not chunk_texts:
+    if not chunk_count:
         print("No text chunks generated from documents")
         return
     
-    print(f"Generated {len(chunk_texts)} chunks, creating embeddings...")
-    
-    # Generate embeddings for all chunks
-    embeddings = embed(chunk_texts)
+    print(f"Successfully ingested {stored_count} chunks from {document_count} documents")
+
+
+def _run_pipeline(
+    source_directory: str,
+    on_first_batch: Optional[Callable[[], None]] = None
+) -> Tuple[int, int, int]:
+    """
+    Run the chunk -> embed -> store pipeline over every source document.
     
-    print("Storing chunks and embeddings in database...")
+    Args:
+        source_directory: Directory containing documents to process
+        on_first_batch: Called once before the first batch is stored
+        
+    Returns:
+        (chunks stored, documents processed, chunks generated)
+    """
+    stop = threading.Event()
+    embed_queue = queue.Queue(maxsize=_PIPELINE_QUEUE_SIZE)
+    store_queue = queue.Queue(maxsize=_PIPELINE_QUEUE_SIZE)
+    document_count = 0
+    chunk_count = 0
     
-    # Store in database
-    upsert_chunks(chunk_metadata, embeddings)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        embed_future = executor.submit(_embed_stage, embed_queue, store_queue, stop)
+        store_future = executor.submit(_store_stage, store_queue, stop, on_first_batch)
+        
+        try:
+            batch = []
+            # Process each document as soon as it is loaded
+            for file_path, full_text in iter_sources(source_directory):
+                print(f"Processing: {file_path}")
+                document_count += 1
+                
+                # Split document into manageable chunks
+                for chunk in chunk_text(full_text, CHUNK_SIZE, CHUNK_OVERLAP):
+                    # Stored stripped so chunk_len and the SQL truncation
+                    # match prepare_context
+                    chunk = chunk.strip()
+                    if not chunk:
+                        continue
+                    batch.append({
+                        "source": file_path,
+                        "chunk": chunk,
+                        "metadata": {}  # Additional metadata can be added here
+                    })
+                    if len(batch) >= INGEST_BATCH_SIZE:
+                        chunk_count += len(batch)
+                        if not _put(embed_queue, batch, stop):
+                            break
+                        batch = []
+                
+                if stop.is_set():
+                    break
+            
+            if batch and not stop.is_set():
+                chunk_count += len(batch)
+                _put(embed_queue, batch, stop)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            _put(embed_queue, _STAGE_DONE, stop)
+        
+        # Surface any worker failure
+        embed_future.result()
+        stored_count = store_future.result()
     
-    print(f"Successfully ingested {len(chunk_texts)} chunks from {len(document_sources)} documents")
+    return stored_count, document_count, chunk_count
@@ -5,13 +5,21 @@ Handles loading and text extraction from various document formats
 including PDF and HTML files.
 """
 
+import multiprocessing
+import os
 import pathlib
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 
 import pdfplumber
 from bs4 import BeautifulSoup
 
+from finbot.config import INGEST_WORKERS
+
+PDF_EXTENSIONS = {".pdf"}
+HTML_EXTENSIONS = {".html", ".htm"}
+
 
 def load_pdf(file_path: Path) -> str:
     """
@@ -59,6 +67,76 @@ def load_html(file_path: Path) -> str:
     return soup.get_text(separator="\n", strip=True)
 
 
+def _load_one(file_path: Path) -> Optional[Tuple[str, str]]:
+    """
+    Load a single document, dispatching on its file extension.
+    
+    Kept at module level so it can be pickled into worker processes.
+    
+    Args:
+        file_path: Path to a PDF or HTML file
+        
+    Returns:
+        Tuple of (file_path, extracted_text), or None if loading failed
+    """
+    try:
+        if file_path.suffix.lower() in PDF_EXTENSIONS:
+            return str(file_path), load_pdf(file_path)
+        return str(file_path), load_html(file_path)
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return None
+
+
+def iter_sources(directory: str) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily load all supported documents from a directory.
+    
+    Args:
+        directory: Directory path containing documents
+        
+    Yields:
+        Tuples of (file_path, extracted_text) in file order
+        
+    Note:
+        Text extraction is CPU-bound, so files are processed in parallel
+        across INGEST_WORKERS processes (defaults to the CPU count).
+        Documents are yielded as soon as they are ready, so callers can
+        start chunking before every file has been extracted.
+    """
+    directory_path = pathlib.Path(directory)
+    
+    if not directory_path.exists():
+        print(f"Warning: Directory {directory} does not exist")
+        return
+    
+    # Collect all supported files in directory recursively
+    file_paths = [
+        file_path for file_path in directory_path.glob("**/*")
+        if file_path.is_file()
+        and file_path.suffix.lower() in PDF_EXTENSIONS | HTML_EXTENSIONS
+    ]
+    
+    if not file_paths:
+        return
+    
+    max_workers = min(INGEST_WORKERS or os.cpu_count() or 1, len(file_paths))
+    if max_workers == 1:
+        results = map(_load_one, file_paths)
+        yield from (result for result in results if result is not None)
+        return
+    
+    # Spawned rather than forked: ingest runs its embed and store threads
+    # while this pool starts, and fork() from a threaded process can deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for result in executor.map(_load_one, file_paths):
+            if result is not None:
+                yield result
+
+
 def load_sources(directory: str) -> List[Tuple[str, str]]:
     """
     Load all supported documents from a directory.
@@ -73,31 +151,4 @@ def load_sources(directory: str) -> List[Tuple[str, str]]:
         - PDF (.pdf)
         - HTML (.html, .htm)
     """
-    directory_path = pathlib.Path(directory)
-    document_sources = []
-    
-    if not directory_path.exists():
-        print(f"Warning: Directory {directory} does not exist")
-        return document_sources
-    
-    # Process all files in directory recursively
-    for file_path in directory_path.glob("**/*"):
-        if not file_path.is_file():
-            continue
-            
-        file_extension = file_path.suffix.lower()
-        
-        try:
-            if file_extension == ".pdf":
-                text_content = load_pdf(file_path)
-                document_sources.append((str(file_path), text_content))
-                
-            elif file_extension in [".html", ".htm"]:
-                text_content = load_html(file_path)
-                document_sources.append((str(file_path), text_content))
-                
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            continue
-    
-    return document_sources
\ No newline at end of file
+    return list(iter_sources(directory))
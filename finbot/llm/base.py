@@ -21,6 +21,8 @@ class BaseLLM(ABC):
             **kwargs: Additional parameters (temperature, max_tokens, etc.)
             
         Yields:
-            Individual response tokens as strings
+            Response text pieces as strings; a backend may yield several
+            tokens per item, so the length limit (MAX_RESPONSE_TOKENS) is
+            enforced by the backend rather than by counting items
         """
         pass
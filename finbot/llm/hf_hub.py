@@ -7,7 +7,7 @@ with models loaded from the HuggingFace Hub.
 
 from transformers.pipelines import pipeline
 from .base import BaseLLM
-from finbot.config import HF_MODEL
+from finbot.config import HF_MODEL, MAX_RESPONSE_TOKENS
 
 
 class HFHubLLM(BaseLLM):
@@ -24,7 +24,7 @@ class HFHubLLM(BaseLLM):
             "text-generation",
             model=HF_MODEL,
             device_map="auto",
-            max_new_tokens=256
+            max_new_tokens=MAX_RESPONSE_TOKENS
         )
 
     def stream(self, prompt: str, **kwargs):
@@ -8,11 +8,33 @@ Optimized for performance with reduced context windows and efficient batching.
 import os
 from typing import Optional
 
+import llama_cpp
 from llama_cpp import Llama
-from finbot.config import LLAMA_PATH, STOP_SEQUENCE, MAX_RESPONSE_TOKENS, LLM_TEMPERATURE
+from finbot.config import (
+    LLAMA_PATH, STOP_SEQUENCE, MAX_RESPONSE_TOKENS, LLM_TEMPERATURE,
+    LLAMA_N_THREADS, LLAMA_N_THREADS_BATCH, LLAMA_N_BATCH,
+    LLAMA_N_GPU_LAYERS, LLAMA_FLASH_ATTN
+)
+from finbot.prompt.formatter import PROMPT_PREFIX
 from .base import BaseLLM
 
 
+def detect_gpu_layers() -> int:
+    """
+    Number of layers to offload to the GPU.
+    
+    Returns:
+        LLAMA_N_GPU_LAYERS if configured, otherwise -1 (all layers) when the
+        installed llama.cpp build supports GPU offload (CUDA/Metal) and 0 if not.
+    """
+    if LLAMA_N_GPU_LAYERS is not None:
+        return LLAMA_N_GPU_LAYERS
+    supports_offload = getattr(llama_cpp, "llama_supports_gpu_offload", None)
+    if supports_offload is not None and supports_offload():
+        return -1
+    return 0
+
+
 class LlamaCppLLM(BaseLLM):
     """Local LLM implementation using llama.cpp for GGUF model inference."""
     
@@ -34,12 +56,58 @@ class LlamaCppLLM(BaseLLM):
         self.llm = Llama(
             model_path=model_path,
             n_ctx=2048,  # Reduced context window for faster inference
-            n_batch=512,  # Efficient batch processing
-            n_threads=4,  # CPU thread limit
+            n_batch=LLAMA_N_BATCH,  # Prompt tokens evaluated per batch
+            n_threads=LLAMA_N_THREADS,  # Threads for token-by-token decode
+            n_threads_batch=LLAMA_N_THREADS_BATCH,  # Threads for prompt prefill
+            n_gpu_layers=detect_gpu_layers(),  # Offload to CUDA/Metal when available
+            flash_attn=LLAMA_FLASH_ATTN,  # Less KV cache bandwidth during decode
             verbose=False,  # Suppress debug output
             use_mmap=True,  # Memory mapping for efficiency
             use_mlock=False,  # Avoid memory locking
         )
+        
+        self._prefix_tokens = None
+        self._prefix_state = None
+        self._cache_prefix(PROMPT_PREFIX)
+
+    def _cache_prefix(self, prefix: str):
+        """
+        Evaluate a constant prompt prefix once and snapshot its KV state.
+        
+        Args:
+            prefix: Text every default prompt starts with
+            
+        Note:
+            Failure only disables the optimization; prompts are still
+            evaluated in full.
+        """
+        try:
+            # Tokenize exactly like create_completion does for the full prompt
+            tokens = self.llm.tokenize(prefix.encode("utf-8"), special=True)
+            self.llm.reset()
+            self.llm.eval(tokens)
+            self._prefix_state = self.llm.save_state()
+            self._prefix_tokens = tokens
+        except Exception:
+            self._prefix_tokens = None
+            self._prefix_state = None
+
+    def _restore_prefix(self, prompt: str):
+        """
+        Restore the cached prefix KV state if the prompt can reuse it.
+        
+        llama.cpp only evaluates tokens after the longest common prefix
+        with its current state, so the restored prefix is not prefilled again.
+        """
+        if self._prefix_state is None or not prompt.startswith(PROMPT_PREFIX):
+            return
+        
+        # Skip the copy if the live KV cache already starts with the prefix
+        prefix_length = len(self._prefix_tokens)
+        if (self.llm.n_tokens >= prefix_length
+                and list(self.llm.input_ids[:prefix_length]) == self._prefix_tokens):
+            return
+        self.llm.load_state(self._prefix_state)
 
     def stream(self, prompt: str, max_tokens: Optional[int] = None, 
                temperature: Optional[float] = None, **kwargs):
@@ -59,8 +127,9 @@ class LlamaCppLLM(BaseLLM):
         temperature = temperature or LLM_TEMPERATURE
         
         try:
-            for token_data in self.llm(
-                prompt, 
+            self._restore_prefix(prompt)
+            for token_data in self.llm.create_completion(
+                prompt,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 stop=STOP_SEQUENCE, 
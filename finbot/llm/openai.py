@@ -5,10 +5,21 @@ Provides LLM inference using OpenAI's API with proper error handling
 and streaming support for real-time responses.
 """
 
+import json
 import os
+import queue
+import threading
+
+import httpx
 from openai import OpenAI
 from .base import BaseLLM
-from finbot.config import OPENAI_MODEL, STOP_SEQUENCE, LLM_TEMPERATURE
+from .stopping import StopScanner
+from finbot.config import OPENAI_MODEL, STOP_SEQUENCE, LLM_TEMPERATURE, MAX_RESPONSE_TOKENS
+
+# Sentinel marking the end of a streamed response
+_STREAM_END = object()
+# The API accepts at most 4 stop sequences; all of them are enforced locally
+_API_STOP_SEQUENCE = STOP_SEQUENCE[:4]
 
 
 class OpenAILLM(BaseLLM):
@@ -24,7 +35,14 @@ class OpenAILLM(BaseLLM):
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        client = OpenAI(api_key=api_key)
+        # Persistent HTTP/2 connections avoid a new TLS handshake per request
+        self.client = OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=4)
+            )
+        )
 
     def stream(self, prompt: str, **kwargs):
         """
@@ -36,17 +54,89 @@ class OpenAILLM(BaseLLM):
             
         Yields:
             Generated text tokens as strings
+            
+        Note:
+            The network stream is consumed on a background thread, so the
+            caller can work on the previous token while the next one arrives.
+            Stop sequences are also detected locally, so generation ends as
+            soon as one appears in the streamed deltas.
+        """
+        tokens = queue.Queue()
+        cancelled = threading.Event()
+        worker = threading.Thread(
+            target=self._produce,
+            args=(prompt, tokens, cancelled),
+            daemon=True
+        )
+        worker.start()
+        
+        try:
+            while True:
+                token = tokens.get()
+                if token is _STREAM_END:
+                    break
+                yield token
+        finally:
+            # Stop reading the response if the caller stopped early
+            cancelled.set()
+
+    def complete_json(self, prompt: str) -> dict:
         """
+        Generate a single JSON object response (no streaming).
+        
+        Args:
+            prompt: Input text prompt; it must ask for JSON output
+            
+        Returns:
+            Parsed JSON object
+            
+        Raises:
+            ValueError: If the response is not a valid JSON object
+        """
+        response = self.client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            response_format={"type": "json_object"})
+        content = response.choices[0].message.content or ""
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Model did not return valid JSON: {e}")
+
+    def _produce(self, prompt: str, tokens: queue.Queue, cancelled: threading.Event):
+        """Read the streamed completion into a queue until done or cancelled."""
         try:
-            response = client.chat.completions.create(# type: ignore
+            response = self.client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=LLM_TEMPERATURE,
-                stop=STOP_SEQUENCE,
+                max_tokens=MAX_RESPONSE_TOKENS,
+                stop=_API_STOP_SEQUENCE,
                 stream=True)
-            for chunk in response:
-                content = chunk.choices[0].delta.get('content', '')
-                if content:
-                    yield content
+            scanner = StopScanner(STOP_SEQUENCE)
+            try:
+                stopped = False
+                for chunk in response:
+                    if cancelled.is_set():
+                        break
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if not content:
+                        continue
+                    text, stopped = scanner.feed(content)
+                    if text:
+                        tokens.put(text)
+                    if stopped:
+                        break
+                if not stopped:
+                    remaining = scanner.flush()
+                    if remaining:
+                        tokens.put(remaining)
+            finally:
+                response.close()
         except Exception as e:
-            yield f"Error: {str(e)}"
+            tokens.put(f"Error: {str(e)}")
+        finally:
+            tokens.put(_STREAM_END)
@@ -0,0 +1,62 @@
+"""
+Stop Sequence Detection
+
+Scans streamed text for stop sequences with an Aho-Corasick automaton,
+which is linear in the generated length regardless of how many stop
+sequences are configured.
+"""
+
+from typing import List, Tuple
+
+import ahocorasick
+
+
+class StopScanner:
+    """Incremental stop-sequence detector for streamed text deltas."""
+    
+    def __init__(self, stop_sequences: List[str]):
+        """
+        Compile the stop sequences into an automaton.
+        
+        Args:
+            stop_sequences: Strings that end generation when produced
+        """
+        self.automaton = ahocorasick.Automaton()
+        for sequence in stop_sequences:
+            self.automaton.add_word(sequence, len(sequence))
+        self.automaton.make_automaton()
+        
+        # Text that could still be the start of a stop sequence is held back
+        self.holdback = max(len(sequence) for sequence in stop_sequences) - 1
+        self.pending = ""
+    
+    def feed(self, delta: str) -> Tuple[str, bool]:
+        """
+        Consume a streamed delta.
+        
+        Args:
+            delta: Newly generated text
+            
+        Returns:
+            Tuple of (text safe to emit, whether a stop sequence was found).
+            When a stop sequence is found, the text before it is returned.
+        """
+        buffer = self.pending + delta
+        
+        # Earliest match start across all stop sequences
+        stop_index = min(
+            (end - length + 1 for end, length in self.automaton.iter(buffer)),
+            default=None
+        )
+        if stop_index is not None:
+            self.pending = ""
+            return buffer[:stop_index], True
+        
+        split = max(len(buffer) - self.holdback, 0)
+        self.pending = buffer[split:]
+        return buffer[:split], False
+    
+    def flush(self) -> str:
+        """Return any held-back text once the stream has ended."""
+        remaining, self.pending = self.pending, ""
+        return remaining
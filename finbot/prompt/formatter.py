@@ -6,7 +6,112 @@ and user queries. Formats prompts according to the Llama-3 chat template
 for better instruction following.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from finbot.config import CONTEXT_MIN_CHARS, CONTEXT_MAX_CHARS
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a helpful Canadian financial expert assistant. "
+    "Answer the user's question using the provided context. "
+    "Give a clear, concise answer. If the answer isn't in the context, "
+    "say 'I don't have that information in the provided documents.'"
+)
+
+
+# Chunks included in the prompt (limited for performance)
+MAX_CONTEXT_CHUNKS = 3
+
+
+def prepare_context(chunk_text: str) -> Optional[str]:
+    """
+    Shape a chunk into the text it contributes to the prompt context.
+    
+    Retrieval calls this once per fetched chunk and stores the result under
+    the "context" key, so build_prompt only has to join ready strings.
+    
+    Args:
+        chunk_text: Raw chunk text
+        
+    Returns:
+        Stripped and truncated text, or None if the chunk is too short to use
+    """
+    chunk_text = chunk_text.strip()
+    if len(chunk_text) <= CONTEXT_MIN_CHARS:  # Filter out very short chunks
+        return None
+    # Truncate excessively long chunks to prevent context overflow
+    if len(chunk_text) > CONTEXT_MAX_CHARS:
+        return chunk_text[:CONTEXT_MAX_CHARS] + "..."
+    return chunk_text
+
+
+def build_prompt_prefix(system: str) -> str:
+    """
+    Build the Llama-3 system block that opens every prompt.
+    
+    Args:
+        system: System instructions
+        
+    Returns:
+        Prompt prefix string
+    """
+    return f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{system}<|eot_id|>"
+
+
+# Constant prefix of every default prompt; backends may cache its KV state
+PROMPT_PREFIX = build_prompt_prefix(DEFAULT_SYSTEM_PROMPT)
+
+# Fixed Llama-3 scaffolding around the context blocks and question, built once
+_CONTEXT_HEADER = "<|start_header_id|>context<|end_header_id|>\n\n"
+_CONTEXT_SEPARATOR = "<|eot_id|>" + _CONTEXT_HEADER
+_QUESTION_HEADER = "<|start_header_id|>user<|end_header_id|>\n\nQuestion: "
+_TAIL = "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+
+
+def _compile_template(prefix: str, num_blocks: int):
+    """
+    Build a formatter for prompts with exactly `num_blocks` context blocks.
+    
+    Returns:
+        Bound str.format taking the context texts followed by the query
+    """
+    def literal(text: str) -> str:
+        return text.replace("{", "{{").replace("}", "}}")
+    
+    blocks = "".join(
+        literal(_CONTEXT_HEADER) + "{" + str(index) + "}<|eot_id|>"
+        for index in range(num_blocks)
+    )
+    question = literal(_QUESTION_HEADER) + "{" + str(num_blocks) + "}" + literal(_TAIL)
+    return (literal(prefix) + blocks + question).format
+
+
+# Default-prompt formatters indexed by context block count, so the common
+# path is a single C-level str.format call
+_DEFAULT_FORMATTERS = tuple(
+    _compile_template(PROMPT_PREFIX, num_blocks) for num_blocks in range(MAX_CONTEXT_CHUNKS + 1)
+)
+
+
+def select_context(retrieved_chunks: List[Dict]) -> List[Tuple[Optional[int], str]]:
+    """
+    Pick the chunks that go into the prompt, in prompt order.
+    
+    Args:
+        retrieved_chunks: Chunks from retrieval, most relevant first
+        
+    Returns:
+        (chunk id, context text) pairs sorted by chunk id; the ids let a
+        serving backend key per-chunk KV caches
+    """
+    selected = []
+    for chunk in retrieved_chunks[:MAX_CONTEXT_CHUNKS]:
+        context = chunk["context"] if "context" in chunk else prepare_context(chunk.get("chunk", ""))
+        if context:
+            selected.append((chunk.get("id"), context))
+    # Chunks without an id go last, keeping their relevance order (the
+    # sort is stable); id 0 is a real id and sorts first
+    selected.sort(key=lambda item: (item[0] is None, item[0] or 0))
+    return selected
 
 
 def build_prompt(
@@ -24,36 +129,29 @@ def build_prompt(
     
     Returns:
         Formatted prompt string ready for the language model
+        
+    Note:
+        The layout is chosen for prefix/KV caching. With default system
+        instructions the prompt starts with the exact bytes of PROMPT_PREFIX.
+        Each chunk then gets its own context block, in chunk-id order (see
+        select_context), and the question comes last:
+        
+            PROMPT_PREFIX
+            <|start_header_id|>context<|end_header_id|>\\n\\n{chunk}<|eot_id|>  (per chunk)
+            <|start_header_id|>user<|end_header_id|>\\n\\nQuestion: {query}<|eot_id|>
+            <|start_header_id|>assistant<|end_header_id|>\\n\\n
+        
+        A given set of chunks always renders to the same bytes regardless of
+        retrieval rank, so only the question block needs fresh prefill.
     """
-    # Define system instructions for the financial assistant
-    system = system_instructions.strip() if system_instructions else (
-        "You are a helpful Canadian financial expert assistant. "
-        "Answer the user's question using the provided context. "
-        "Give a clear, concise answer. If the answer isn't in the context, "
-        "say 'I don't have that information in the provided documents.'"
-    )
-
-    # Process and limit context from retrieved chunks
-    context_parts = []
-    for i, chunk in enumerate(retrieved_chunks[:3]):  # Limit to top 3 chunks for performance
-        chunk_text = chunk.get("chunk", "").strip()
-        if chunk_text and len(chunk_text) > 50:  # Filter out very short chunks
-            # Truncate excessively long chunks to prevent context overflow
-            if len(chunk_text) > 400:
-                chunk_text = chunk_text[:400] + "..."
-            context_parts.append(chunk_text)
+    # Retrieval precomputes "context", so no chunk text is reshaped here
+    contexts = [context for _, context in select_context(retrieved_chunks)]
 
-    context = "\n\n".join(context_parts)
+    # Default system instructions use the specialized formatters
+    if not system_instructions:
+        return _DEFAULT_FORMATTERS[len(contexts)](*contexts, query)
 
     # Format using Llama-3 chat template for optimal performance
-    prompt = f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
-
-{system}<|eot_id|><|start_header_id|>user<|end_header_id|>
-
-Context:
-{context}
-
-Question: {query}<|eot_id|><|start_header_id|>assistant<|end_header_id|>
-
-"""
-    return prompt
\ No newline at end of file
+    prefix = build_prompt_prefix(system_instructions.strip())
+    blocks = _CONTEXT_HEADER + _CONTEXT_SEPARATOR.join(contexts) + "<|eot_id|>" if contexts else ""
+    return prefix + blocks + _QUESTION_HEADER + query + _TAIL
\ No newline at end of file
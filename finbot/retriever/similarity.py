@@ -5,91 +5,289 @@ Handles semantic search using cosine similarity on document embeddings
 stored in PostgreSQL with pgvector extension.
 """
 
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 import numpy as np
 
-from finbot.db.client import get_connection
-from finbot.config import TOP_K
-import re
-from finbot.llm.openai import OpenAILLM
-from pgvector.psycopg2.vector import Vector
+from finbot.db.client import db_conn, set_search_options, CONTEXT_SQL, TOPK_STATEMENT
+from finbot.config import (
+    TOP_K, ANN_EF_SEARCH, RETRIEVAL_CANDIDATES, RERANK_BACKEND, EMBED_DIMENSION,
+    RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_THRESHOLD, CONTEXT_MIN_CHARS
+)
 
+# Upper bound pgvector accepts for hnsw.ef_search
+MAX_EF_SEARCH = 1000
 
-def retrieve_similar(query_embedding: np.ndarray, top_k: int = TOP_K) -> List[Dict[str, Any]]:
+# Rows per round trip when streaming batch results from a server-side cursor
+BATCH_FETCH_SIZE = 64
+
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache():
+    """Get the process-wide LSH retrieval cache, or None when disabled."""
+    if RETRIEVAL_CACHE_SIZE <= 0:
+        return None
+    from finbot.cache.lsh_cache import LSHCache
+    return LSHCache(
+        EMBED_DIMENSION,
+        capacity=RETRIEVAL_CACHE_SIZE,
+        threshold=RETRIEVAL_CACHE_THRESHOLD
+    )
+
+
+def retrieve_similar(
+    query_embedding: np.ndarray,
+    top_k: int = TOP_K,
+    ef_search: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Retrieve the most similar document chunks for a given query embedding.
     
     Args:
         query_embedding: NumPy array representing the query's embedding vector
         top_k: Number of most similar chunks to retrieve
+        ef_search: HNSW candidate list size; higher trades latency for
+                   recall. Defaults to ANN_EF_SEARCH; raised to the
+                   prefilter size (RETRIEVAL_CANDIDATES) if smaller.
         
     Returns:
         List of dictionaries containing chunk data and similarity scores
-        Each dict contains: chunk, metadata, source, score
+        Each dict contains: id, chunk, metadata, source, score, context.
+        "chunk" is the stripped text truncated for the prompt, and chunks
+        too short to use are excluded by the query.
         
     Note:
-        Returns empty list if no similar chunks found or on database error
+        Returns empty list if no similar chunks found or on database error.
+        Candidates come from the binary-quantized HNSW index and are
+        reranked by exact cosine distance in the same query.
+        Results for near-identical queries are served from the in-process
+        LSH cache without touching the database, unless ef_search is given.
     """
     if query_embedding is None or len(query_embedding) == 0:
         return []
         
-    vector = Vector(query_embedding.tolist())
-    connection = get_connection()
-    cursor = None
+    # register_vector adapts NumPy arrays directly, no tolist() needed
+    vector = np.ascontiguousarray(query_embedding, dtype=np.float32)
+    
+    # Cached results were retrieved with the default search width, so an
+    # explicit ef_search bypasses the cache
+    cache = get_retrieval_cache() if ef_search is None else None
+    if cache is not None:
+        cached = cache.get(vector, top_k)
+        if cached is not None:
+            return cached
     
     try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT chunk, metadata, source, embedding <=> %s AS distance
-            FROM documents
-            ORDER BY embedding <=> %s
-            LIMIT %s;
-        """, (vector, vector, top_k))
+        with db_conn() as connection, connection.cursor() as cursor:
+            # Candidate list size for the HNSW search (recall vs. latency);
+            # it caps the rows an index scan returns, so cover the prefilter
+            candidates = _candidate_count(top_k)
+            set_search_options(cursor, _search_ef(ef_search, candidates))
+            # Prepared on connect (see VectorConnectionPool); the query is
+            # parsed straight into halfvec to match the column
+            cursor.execute(
+                f"EXECUTE {TOPK_STATEMENT}(%s::halfvec, %s, %s);", (vector, top_k, candidates)
+            )
+            
+            results = cursor.fetchall()
         
-        results = cursor.fetchall()
+        # Rows arrive as dicts; only the prompt context is added here
+        similar_chunks = [_add_context(row) for row, in results]
         
-        # Format results for consumption
-        similar_chunks = []
-        for chunk, metadata, source, distance in results:
-            similar_chunks.append({
-                "chunk": chunk,
-                "metadata": metadata,
-                "source": source,
-                "score": distance
-            })
+        if cache is not None and similar_chunks:
+            cache.put(vector, top_k, similar_chunks)
         
         return similar_chunks
         
     except Exception as e:
         print(f"Error retrieving similar chunks: {e}")
         return []
-    finally:
-        if cursor:
-            cursor.close()
-        connection.close()
+
+
+def retrieve_similar_batch(
+    query_embeddings: np.ndarray,
+    top_k: int = TOP_K,
+    ef_search: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve the most similar chunks for several query embeddings at once.
+    
+    Args:
+        query_embeddings: NumPy array with shape (num_queries, embedding_dim)
+        top_k: Number of most similar chunks to retrieve per query
+        ef_search: HNSW candidate list size. Defaults to ANN_EF_SEARCH;
+                   raised to RETRIEVAL_CANDIDATES if smaller.
+        
+    Returns:
+        One list of chunk dictionaries per query, in input order
+        (same format as retrieve_similar)
+        
+    Note:
+        All cache misses are answered by a single LATERAL join query, so
+        the batch costs one round trip instead of one per query. Each
+        query runs the same two-stage search as retrieve_similar, so both
+        paths return (and cache) the same results. Rows are streamed
+        through a server-side cursor rather than fetched at once.
+    """
+    if query_embeddings is None or len(query_embeddings) == 0:
+        return []
+    
+    vectors = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+    batch_results: List[List[Dict[str, Any]]] = [[] for _ in range(len(vectors))]
+    
+    # An explicit ef_search bypasses the cache (see retrieve_similar)
+    cache = get_retrieval_cache() if ef_search is None else None
+    pending = []
+    for index, vector in enumerate(vectors):
+        cached = cache.get(vector, top_k) if cache is not None else None
+        if cached is None:
+            pending.append(index)
+        else:
+            batch_results[index] = cached
+    
+    if not pending:
+        return batch_results
+    
+    values = ", ".join(["(%s, %s::halfvec)"] * len(pending))
+    params = [item for index in pending for item in (index, vectors[index])]
+    
+    candidates = _candidate_count(top_k)
+    try:
+        with db_conn() as connection:
+            with connection.cursor() as cursor:
+                set_search_options(cursor, _search_ef(ef_search, candidates))
+            
+            # Server-side cursor: rows are fetched in pages of BATCH_FETCH_SIZE,
+            # so decoding overlaps with the transfer of the remaining rows
+            with connection.cursor(name="finbot_topk_batch") as cursor:
+                cursor.itersize = BATCH_FETCH_SIZE
+                cursor.execute(f"""
+                    SELECT q.idx, jsonb_build_object(
+                        'id', d.id, 'chunk', d.context, 'metadata', d.metadata,
+                        'source', d.source, 'score', d.distance
+                    )
+                    FROM (VALUES {values}) AS q(idx, embedding)
+                    CROSS JOIN LATERAL (
+                        SELECT id, {CONTEXT_SQL} AS context, metadata, source,
+                               embedding <=> q.embedding AS distance
+                        FROM (
+                            -- Hamming prefilter, as in TOPK_SQL
+                            SELECT id, chunk, chunk_len, metadata, source, embedding
+                            FROM documents
+                            WHERE chunk_len > {CONTEXT_MIN_CHARS}
+                            ORDER BY embedding_bits <~> binary_quantize(q.embedding)::bit({EMBED_DIMENSION})
+                            LIMIT %s
+                        ) AS candidates
+                        ORDER BY distance
+                        LIMIT %s
+                    ) AS d
+                    ORDER BY q.idx, d.distance;
+                """, params + [candidates, top_k])
+                
+                for index, row in cursor:
+                    batch_results[index].append(_add_context(row))
+        
+        if cache is not None:
+            for index in pending:
+                if batch_results[index]:
+                    cache.put(vectors[index], top_k, batch_results[index])
+        
+    except Exception as e:
+        print(f"Error retrieving similar chunks: {e}")
+        # Drop partially streamed results
+        for index in pending:
+            batch_results[index] = []
+    
+    return batch_results
+
+
+def _candidate_count(top_k: int) -> int:
+    """Rows the Hamming prefilter fetches for exact reranking."""
+    return min(max(RETRIEVAL_CANDIDATES, top_k), MAX_EF_SEARCH)
+
+
+def _search_ef(ef_search: Optional[int], rows: int) -> int:
+    """HNSW ef_search for a scan that must be able to return `rows` rows."""
+    return min(max(ef_search or ANN_EF_SEARCH, rows), MAX_EF_SEARCH)
+
+
+def _add_context(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach the prompt context of a result row.
+    
+    The database already returns the prompt-ready text (see CONTEXT_SQL
+    and formatter.prepare_context), so the chunk is its own context.
+    """
+    row["context"] = row["chunk"]
+    return row
+
+
+@lru_cache(maxsize=1)
+def get_rerank_llm():
+    """Get the OpenAI client used for reranking, created once per process."""
+    from finbot.llm.openai import OpenAILLM
+    return OpenAILLM()
 
 
 def rerank_chunks(query: str, chunks: List[Dict[str, Any]], top_k: int = TOP_K) -> List[Dict[str, Any]]:
     """
-    Rerank retrieved chunks by relevance to the query using OpenAI.
-    Returns the top_k chunks in ranked order.
+    Rerank retrieved chunks by relevance to the query.
+    
+    Args:
+        query: User query
+        chunks: Chunks returned by retrieve_similar
+        top_k: Number of chunks to keep
+        
+    Returns:
+        The top_k chunks in ranked order
+        
+    Note:
+        RERANK_BACKEND selects a local INT8 ONNX cross-encoder ("onnx",
+        default), the sentence-transformers CrossEncoder ("cross_encoder")
+        or an OpenAI chat model ("llm").
     """
     if not chunks:
         return []
-    llm = OpenAILLM()
+    if RERANK_BACKEND == "llm":
+        return _rerank_with_llm(query, chunks, top_k)
+    
+    from finbot.retriever.reranker import score_chunks
+    scores = score_chunks(query, chunks)
+    return [chunks[index] for index in np.argsort(-scores)[:top_k]]
+
+
+def _rerank_with_llm(query: str, chunks: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Rerank retrieved chunks by relevance to the query using OpenAI.
+    Returns the top_k chunks in ranked order.
+    
+    Note:
+        The model answers in JSON mode, so the ranking is read from a
+        structured "order" list rather than scraped from free text. Falls
+        back to retrieval order if the response cannot be used.
+    """
+    llm = get_rerank_llm()
     # Prepare passages
     passages = "\n\n".join(f"{idx+1}. {chunk['chunk']}" for idx, chunk in enumerate(chunks))
     prompt = (
         f"Rank the following passages by relevance to the query: \"{query}\".\n"
-        f"Return the top {top_k} passage numbers in descending order, separated by commas.\nPassages:\n{passages}\nRanked list:"
+        f"Return a JSON object of the form {{\"order\": [...]}} listing the top {top_k} "
+        f"passage numbers in descending order of relevance.\nPassages:\n{passages}"
     )
-    # Generate ranking
-    response = ''.join(llm.stream(prompt))
-    # Extract passage numbers
-    nums = re.findall(r"\d+", response)
+    try:
+        order = llm.complete_json(prompt).get("order", [])
+    except Exception as e:
+        print(f"Error reranking chunks: {e}")
+        return chunks[:top_k]
+    
     ranked = []
-    for n in nums[:top_k]:
-        idx = int(n) - 1
-        if 0 <= idx < len(chunks):
-            ranked.append(chunks[idx])
-    return ranked
\ No newline at end of file
+    seen = set()
+    for number in order:
+        if not isinstance(number, int) or isinstance(number, bool) or number in seen:
+            continue
+        seen.add(number)
+        if 1 <= number <= len(chunks):
+            ranked.append(chunks[number - 1])
+        if len(ranked) == top_k:
+            break
+    return ranked or chunks[:top_k]
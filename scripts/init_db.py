@@ -3,70 +3,173 @@ Database Initialization Script
 
 Sets up the PostgreSQL database with pgvector extension and creates
 the necessary tables for storing document chunks and embeddings.
+
+For bulk loads, initialize without indexes (--no-index), load the
+documents, then build the indexes once with --finalize.
 """
 
+import argparse
+
 import psycopg2
-from pgvector.psycopg2 import register_vector
 
-from finbot.config import DB_URI
+from finbot.config import DB_URI, EMBED_DIMENSION
+from finbot.db.client import create_ann_index, prewarm_relations
 
 
-def initialize_database():
+def initialize_database(create_indexes: bool = True):
     """
     Initialize the database schema for FinBot.
     
     Creates:
     - pgvector extension
-    - documents table with vector column
-    - Index for efficient similarity search
+    - documents table with half-precision (halfvec) embedding column
+    - embedding_bits column with a binary-quantized copy of each embedding
+    - chunk_len column used to filter out chunks too short for the prompt
+    - HNSW indexes for efficient similarity search (unless create_indexes
+      is False; see finalize_database)
+    
+    Existing tables with a full-precision vector column are migrated
+    to halfvec in place.
+    
+    Args:
+        create_indexes: Build the HNSW indexes now; skip them when a bulk
+                        load follows, since maintaining them row by row
+                        is much slower than building them once
     
     Raises:
         psycopg2.Error: If database setup fails
     """
     try:
         connection = psycopg2.connect(DB_URI)
-        register_vector(connection)
         cursor = connection.cursor()
         
         # Create pgvector extension
         cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
         
-        # Create documents table
-        cursor.execute("""
+        # Create documents table (halfvec halves heap and index size)
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS documents (
                 id SERIAL PRIMARY KEY,
                 source TEXT NOT NULL,
                 chunk TEXT NOT NULL,
-                metadata JSONB DEFAULT '{}',
-                embedding vector(384)
+                metadata JSONB DEFAULT '{{}}',
+                embedding halfvec({EMBED_DIMENSION})
             );
         """)
         
-        # Create index for efficient similarity search
+        # Migrate tables created with a float32 vector column
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_embedding 
-            ON documents USING ivfflat (embedding vector_cosine_ops) 
-            WITH (lists = 100);
+            SELECT udt_name FROM information_schema.columns
+            WHERE table_name = 'documents' AND column_name = 'embedding';
         """)
+        column_type = cursor.fetchone()
+        if column_type and column_type[0] == "vector":
+            cursor.execute("DROP INDEX IF EXISTS idx_embedding;")
+            cursor.execute(f"""
+                ALTER TABLE documents
+                ALTER COLUMN embedding TYPE halfvec({EMBED_DIMENSION})
+                USING embedding::halfvec({EMBED_DIMENSION});
+            """)
+            print("- embedding column migrated to halfvec")
+        
+        # 1-bit sketch of each embedding for the Hamming-distance prefilter
+        cursor.execute(f"""
+            ALTER TABLE documents
+            ADD COLUMN IF NOT EXISTS embedding_bits bit({EMBED_DIMENSION})
+            GENERATED ALWAYS AS (binary_quantize(embedding)::bit({EMBED_DIMENSION})) STORED;
+        """)
+        
+        # Chunk length, so retrieval can filter short chunks in SQL. Chunks
+        # are stripped at ingest, so no trimming is needed here; truncation
+        # happens at query time (db.client.CONTEXT_SQL). chunk_trunc was
+        # generated with a fixed CONTEXT_MAX_CHARS by earlier versions
+        cursor.execute("""
+            ALTER TABLE documents
+            ADD COLUMN IF NOT EXISTS chunk_len int
+            GENERATED ALWAYS AS (length(chunk)) STORED,
+            DROP COLUMN IF EXISTS chunk_trunc;
+        """)
+        
+        # Replace the IVFFlat index used by earlier versions
+        cursor.execute("""
+            SELECT 1 FROM pg_indexes
+            WHERE indexname = 'idx_embedding' AND indexdef ILIKE '%%USING ivfflat%%';
+        """)
+        if cursor.fetchone():
+            cursor.execute("DROP INDEX idx_embedding;")
+            print("- ivfflat index replaced with hnsw")
+        
+        # Create HNSW indexes for efficient similarity search
+        if create_indexes:
+            create_ann_index(cursor)
         
         connection.commit()
         cursor.close()
+        if create_indexes:
+            prewarm_relations(connection)
         connection.close()
         
         print("Database initialized successfully")
         print("- pgvector extension created")
         print("- documents table created")
-        print("- similarity search index created")
+        if create_indexes:
+            print("- similarity search indexes (hnsw) created")
+        else:
+            print("- similarity search indexes skipped (run with --finalize after loading)")
         
     except psycopg2.Error as e:
         print(f"Database initialization failed: {e}")
         raise
 
 
+def finalize_database():
+    """
+    Build the similarity search indexes after a bulk load.
+    
+    Raises:
+        psycopg2.Error: If index creation fails
+    """
+    try:
+        connection = psycopg2.connect(DB_URI)
+        cursor = connection.cursor()
+        
+        create_ann_index(cursor)
+        # Refresh planner statistics for the freshly loaded table
+        cursor.execute("ANALYZE documents;")
+        
+        connection.commit()
+        cursor.close()
+        prewarm_relations(connection)
+        connection.close()
+        
+        print("Database finalized successfully")
+        print("- similarity search indexes (hnsw) created")
+        
+    except psycopg2.Error as e:
+        print(f"Database finalization failed: {e}")
+        raise
+
+
 def main():
     """Main entry point for database initialization."""
+    parser = argparse.ArgumentParser(description="Initialize the FinBot database")
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Skip index creation (for bulk loads; run --finalize afterwards)"
+    )
+    parser.add_argument(
+        "--finalize",
+        action="store_true",
+        help="Build the similarity search indexes after a bulk load"
+    )
+    args = parser.parse_args()
+    
     try:
-        initialize_database()
+        if args.finalize:
+            finalize_database()
+        else:
+            initialize_database(create_indexes=not args.no_index)
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
@@ -37,6 +37,8 @@ def check_required_packages() -> bool:
         "psycopg2": "psycopg2",
         "pgvector": "pgvector", 
         "sentence_transformers": "sentence_transformers",
+        "onnxruntime": "onnxruntime",
+        "optimum": "optimum",
         "transformers": "transformers",
         "rich": "rich",
         "pdfplumber": "pdfplumber",
@@ -0,0 +1,6 @@
+"""Shared pytest setup; loaded before any test module imports finbot."""
+
+import os
+
+# finbot.config validates on import and would require a real LLAMA_PATH
+os.environ.setdefault("SKIP_CONFIG_VALIDATION", "1")
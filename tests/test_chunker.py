@@ -0,0 +1,51 @@
+"""Tests for token-based document chunking."""
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("transformers")
+
+from finbot.ingestion import chunker
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    try:
+        return chunker.get_tokenizer()
+    except Exception as e:  # Model not cached and no network
+        pytest.skip(f"Embedding tokenizer unavailable: {e}")
+
+
+def _token_count(tokenizer, text):
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def test_chunks_retokenize_within_chunk_size(tokenizer):
+    text = " ".join(
+        "The Tax-Free Savings Account (TFSA) contribution room accumulates "
+        "annually; unused room carries forward indefinitely."
+        for _ in range(40)
+    )
+    chunks = chunker.chunk_text(text, chunk_size=32, overlap=8)
+    
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert _token_count(tokenizer, chunk) <= 32
+
+
+def test_chunks_do_not_split_words(tokenizer):
+    words = [f"RRSPcontribution{i}" for i in range(200)]
+    chunks = chunker.chunk_text(" ".join(words), chunk_size=30, overlap=5)
+    
+    vocabulary = set(words)
+    for chunk in chunks:
+        assert set(chunk.split()) <= vocabulary
+
+
+def test_short_text_is_one_chunk(tokenizer):
+    assert chunker.chunk_text("Short text.", chunk_size=32, overlap=8) == ["Short text."]
+
+
+def test_overlap_must_be_smaller_than_chunk_size(tokenizer):
+    with pytest.raises(ValueError):
+        chunker.chunk_text("text", chunk_size=8, overlap=8)
@@ -0,0 +1,86 @@
+"""Tests for the binary COPY encoding used by bulk_load_embeddings."""
+
+import json
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("psycopg2")
+pytest.importorskip("pgvector")
+
+from finbot.db.client import COPY_HEADER, COPY_TRAILER, encode_copy_rows
+
+SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+
+def _decode(data):
+    """Split a binary COPY stream into tuples of raw field bytes."""
+    assert data[:len(SIGNATURE)] == SIGNATURE
+    flags, extension_length = struct.unpack_from(">ii", data, len(SIGNATURE))
+    assert (flags, extension_length) == (0, 0)
+    offset = len(SIGNATURE) + 8 + extension_length
+    
+    tuples = []
+    while True:
+        (field_count,) = struct.unpack_from(">h", data, offset)
+        offset += 2
+        if field_count == -1:
+            break
+        fields = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from(">i", data, offset)
+            offset += 4
+            fields.append(data[offset:offset + length])
+            offset += length
+        tuples.append(fields)
+    
+    assert offset == len(data), "trailing bytes after the COPY trailer"
+    return tuples
+
+
+def _decode_halfvec(field):
+    dimension, unused = struct.unpack_from(">HH", field)
+    assert unused == 0
+    assert len(field) == 4 + 2 * dimension
+    return np.frombuffer(field, dtype=">f2", offset=4)
+
+
+def test_empty_input_is_header_and_trailer_only():
+    buffer, count = encode_copy_rows([])
+    
+    assert count == 0
+    assert buffer.getvalue() == COPY_HEADER + COPY_TRAILER
+
+
+def test_rows_round_trip():
+    embeddings = [
+        np.array([0.5, -1.25, 2.0], dtype=np.float32),
+        np.array([1.0, 0.0, -0.0009765625], dtype=np.float32),
+    ]
+    rows = [
+        ("guide.pdf", "TFSA room carries forward.", {"page": 3}, embeddings[0]),
+        ("faq.html", "RRSP – déductions", {}, embeddings[1]),
+    ]
+    
+    buffer, count = encode_copy_rows(rows)
+    tuples = _decode(buffer.read())
+    
+    assert count == len(tuples) == 2
+    for (source, chunk, metadata, embedding), fields in zip(rows, tuples):
+        assert len(fields) == 4
+        assert fields[0].decode("utf-8") == source
+        assert fields[1].decode("utf-8") == chunk
+        # jsonb binary format: version byte, then the JSON text
+        assert fields[2][:1] == b"\x01"
+        assert json.loads(fields[2][1:]) == metadata
+        np.testing.assert_array_equal(_decode_halfvec(fields[3]), embedding.astype(np.float16))
+
+
+def test_field_lengths_count_utf8_bytes():
+    chunk = "Épargne – 2024 ✓"
+    buffer, _ = encode_copy_rows([("s", chunk, {}, np.zeros(2, dtype=np.float32))])
+    
+    fields = _decode(buffer.read())[0]
+    
+    assert len(fields[1]) == len(chunk.encode("utf-8")) > len(chunk)
@@ -0,0 +1,46 @@
+"""Tests for prompt context selection and layout."""
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from finbot.prompt.formatter import PROMPT_PREFIX, build_prompt, select_context
+
+LONG_TEXT = "Registered retirement savings plan contributions are tax deductible. "
+
+
+def _chunk(chunk_id, label):
+    chunk = {"chunk": f"{label}: {LONG_TEXT}"}
+    if chunk_id is not None:
+        chunk["id"] = chunk_id
+    return chunk
+
+
+def test_select_context_orders_by_chunk_id():
+    chunks = [_chunk(7, "seven"), _chunk(0, "zero"), _chunk(3, "three")]
+    
+    assert [chunk_id for chunk_id, _ in select_context(chunks)] == [0, 3, 7]
+
+
+def test_select_context_puts_chunks_without_id_last():
+    chunks = [_chunk(None, "first"), _chunk(5, "five"), _chunk(None, "second")]
+    
+    selected = select_context(chunks)
+    
+    assert [chunk_id for chunk_id, _ in selected] == [5, None, None]
+    assert selected[1][1].startswith("first")
+    assert selected[2][1].startswith("second")
+
+
+def test_select_context_skips_short_chunks():
+    chunks = [{"id": 1, "chunk": "too short"}, _chunk(2, "two")]
+    
+    assert [chunk_id for chunk_id, _ in select_context(chunks)] == [2]
+
+
+def test_build_prompt_starts_with_shared_prefix():
+    prompt = build_prompt("What is an RRSP?", [_chunk(4, "four"), _chunk(1, "one")])
+    
+    assert prompt.startswith(PROMPT_PREFIX)
+    assert prompt.index("one:") < prompt.index("four:")
+    assert "What is an RRSP?" in prompt
@@ -0,0 +1,62 @@
+"""Tests for streamed stop-sequence detection."""
+
+import pytest
+
+pytest.importorskip("ahocorasick")
+
+from finbot.llm.stopping import StopScanner
+
+STOPS = ["### Question", "<|eot_id|>", "</s>"]
+
+
+def _run(deltas, stops=STOPS):
+    """Feed deltas like a backend does; returns (emitted text, stopped)."""
+    scanner = StopScanner(stops)
+    emitted = []
+    for delta in deltas:
+        text, stopped = scanner.feed(delta)
+        emitted.append(text)
+        if stopped:
+            return "".join(emitted), True
+    emitted.append(scanner.flush())
+    return "".join(emitted), False
+
+
+def test_text_without_stop_sequence_is_emitted_in_full():
+    deltas = ["The TFSA ", "limit is ", "$7,000."]
+    
+    assert _run(deltas) == ("The TFSA limit is $7,000.", False)
+
+
+def test_stop_sequence_within_one_delta():
+    assert _run(["Answer.</s>ignored"]) == ("Answer.", True)
+
+
+def test_stop_sequence_split_across_deltas():
+    deltas = ["Answer.", "<|e", "ot_", "id|>", " ignored"]
+    
+    assert _run(deltas) == ("Answer.", True)
+
+
+def test_stop_sequence_split_one_character_per_delta():
+    assert _run(list("Done.### Question: next")) == ("Done.", True)
+
+
+def test_earliest_stop_sequence_wins():
+    assert _run(["a</s>b<|eot_id|>c"]) == ("a", True)
+    assert _run(["a<|eot_id|>b</s>c"]) == ("a", True)
+
+
+def test_possible_stop_prefix_is_held_back():
+    scanner = StopScanner(STOPS)
+    
+    text, stopped = scanner.feed("Answer <|eo")
+    
+    assert not stopped
+    # Nothing that could start "<|eot_id|>" leaves the scanner yet
+    assert "<" not in text
+    assert text + scanner.flush() == "Answer <|eo"
+
+
+def test_partial_stop_prefix_is_flushed_at_end_of_stream():
+    assert _run(["Answer </"]) == ("Answer </", False)